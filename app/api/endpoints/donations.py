@@ -1,14 +1,25 @@
-from typing import List
+from datetime import datetime
+from http import HTTPStatus
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.utilits import (NDJSONResponse, get_donation_for_user_or_404,
+                             ndjson_response, orjson_response)
+from app.core.config import settings
+from app.core.constants import MAX_PAGE_SIZE
 from app.core.db import get_async_session
 from app.core.user import current_superuser, current_user
 from app.crud.donations import donation_crud
+from app.crud.investments import investment_crud
 from app.models import User
 from app.schemas.donation import (DonationCreate, DonationGetForSuperuser,
-                                  DonationGetForUser)
+                                  DonationGetForUser, DonationImportReport,
+                                  DonationStatus)
+from app.schemas.investment import InvestmentDB
+from app.services.allocation_queue import allocation_queue
+from app.services.donation_import import import_donations
 from app.services.investment import investment_service
 
 router = APIRouter()
@@ -21,10 +32,25 @@ router = APIRouter()
     dependencies=[Depends(current_superuser)],
 )
 async def get_all_donations(
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        after_id: Optional[int] = None,
+        stream: bool = False,
         session: AsyncSession = Depends(get_async_session)
 ):
-    """Только для суперюзеров. Возвращает список всех пожертвований."""
-    donations = await donation_crud.get_multi(session)
+    """Только для суперюзеров. Возвращает список всех пожертвований.
+    Поддерживает keyset-пагинацию (limit, after_id) и потоковую
+    выдачу в NDJSON (stream=true)."""
+    if stream:
+        return ndjson_response(
+            donation_crud.stream_multi(session, limit, after_id),
+            DonationGetForSuperuser
+        )
+    if settings.orjson_responses:
+        return orjson_response(
+            await donation_crud.get_multi_rows(session, limit, after_id),
+            DonationGetForSuperuser
+        )
+    donations = await donation_crud.get_multi(session, limit, after_id)
     return donations
 
 
@@ -39,7 +65,32 @@ async def create_donation(
         user: User = Depends(current_user),
 ):
     """Возвращает созданое пожертвование."""
-    return await investment_service.create_donat(session, donation, user)
+    donation = await investment_service.create_donat(session, donation, user)
+    if settings.async_allocation:
+        allocation_queue.notify()
+    return donation
+
+
+@router.post(
+    '/import',
+    response_model=DonationImportReport,
+)
+async def import_donations_csv(
+        response: Response,
+        file: UploadFile = File(...),
+        dry_run: bool = False,
+        user: User = Depends(current_superuser),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров. Импорт пожертвований из CSV
+    с колонками full_amount, comment, user_id, create_date.
+    При dry_run=true файл только проверяется. Если в файле есть
+    ошибки (в том числе несуществующий user_id или кодировка
+    не UTF-8), ничего не импортируется и возвращается статус 400."""
+    report = await import_donations(session, file.file, user.id, dry_run)
+    if report.errors:
+        response.status_code = HTTPStatus.BAD_REQUEST
+    return report
 
 
 @router.get(
@@ -49,10 +100,58 @@ async def create_donation(
     response_model_exclude={'user_id'},
 )
 async def get_my_donations(
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        after_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
         user: User = Depends(current_user),
         session: AsyncSession = Depends(get_async_session),
 ):
-    """Вернуть список пожертвований пользователя, выполняющего запрос."""
+    """Вернуть список пожертвований пользователя, выполняющего запрос.
+    Поддерживает keyset-пагинацию (limit, after_id) и фильтр
+    по дате создания [created_from, created_to)."""
     my_donations = await donation_crud.get_multi_donations_current_user(
-        user=user, session=session)
+        user=user, session=session, limit=limit, after_id=after_id,
+        created_from=created_from, created_to=created_to)
     return my_donations
+
+
+@router.get(
+    '/{donation_id}/status',
+    response_model=DonationStatus,
+)
+async def get_donation_status(
+        donation_id: int,
+        user: User = Depends(current_user),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Статус распределения пожертвования.
+    Пользователю доступны только собственные пожертвования."""
+    donation, allocation_pending = await get_donation_for_user_or_404(
+        donation_id, user, session
+    )
+    return DonationStatus(
+        id=donation.id,
+        distributed=not allocation_pending,
+        invested_amount=donation.invested_amount,
+        fully_invested=donation.fully_invested,
+    )
+
+
+@router.get(
+    '/{donation_id}/investments',
+    response_class=NDJSONResponse,
+)
+async def get_donation_investments(
+        donation_id: int,
+        user: User = Depends(current_user),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Журнал распределений пожертвования в формате NDJSON:
+    в какие проекты и в каком размере направлены средства.
+    Пользователю доступны только собственные пожертвования."""
+    await get_donation_for_user_or_404(donation_id, user, session)
+    return ndjson_response(
+        investment_crud.stream_by_donation(donation_id, session),
+        InvestmentDB
+    )
@@ -1,32 +1,75 @@
-from aiogoogle import Aiogoogle
-from fastapi import APIRouter, Depends
+from http import HTTPStatus
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import REPORT_JOB_NO_FOUND_ERROR
 from app.core.db import get_async_session
-from app.core.google_client import get_service
 from app.core.user import current_superuser
 from app.crud.projects import charity_project_crud
-from app.services.google_api import (set_user_permissions, spreadsheets_create,
-                                     spreadsheets_update_value)
+from app.crud.report_jobs import report_job_crud
+from app.models import User
+from app.schemas.charityproject import ProjectDB
+from app.schemas.report_job import ReportJobCreate, ReportJobDB
+from app.services.report_jobs import report_queue
 
 router = APIRouter()
 
 
 @router.post(
     '/',
-    dependencies=[Depends(current_superuser)],
+    response_model=ReportJobDB,
+    status_code=HTTPStatus.ACCEPTED,
 )
 async def get_report(
+        limit: Optional[int] = Query(None, ge=1),
         session: AsyncSession = Depends(get_async_session),
-        wrapper_services: Aiogoogle = Depends(get_service)
+        user: User = Depends(current_superuser),
+):
+    """Только для суперюзеров. Ставит в очередь формирование отчета
+    и сразу возвращает задачу; статус и ссылка на документ —
+    GET /google/{job_id}.
+    limit ограничивает отчет первыми по скорости закрытия проектами."""
+    job = await report_job_crud.create(
+        ReportJobCreate(project_limit=limit), session, user
+    )
+    report_queue.notify()
+    return job
 
+
+@router.get(
+    '/projects',
+    response_model=List[ProjectDB],
+    response_model_exclude_none=True,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_report_projects(
+        limit: Optional[int] = Query(None, ge=1),
+        session: AsyncSession = Depends(get_async_session),
 ):
-    """Только для суперюзеров."""
-    projects = await charity_project_crud.get_projects_by_completion_rate(
-        session
+    """Только для суперюзеров. Закрытые проекты в порядке отчета
+    (по скорости закрытия) со всеми полями — то, что раньше
+    возвращал POST /google/."""
+    return await charity_project_crud.get_closed_projects_by_completion_rate(
+        session, limit
     )
-    spreadsheet_id = await spreadsheets_create(wrapper_services)
-    await set_user_permissions(spreadsheet_id, wrapper_services)
-    await spreadsheets_update_value(spreadsheet_id,
-                                    projects, wrapper_services)
-    return projects
+
+
+@router.get(
+    '/{job_id}',
+    response_model=ReportJobDB,
+    dependencies=[Depends(current_superuser)],
+)
+async def get_report_job(
+        job_id: int,
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров. Статус задачи формирования отчета."""
+    job = await report_job_crud.get(job_id, session)
+    if job is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=REPORT_JOB_NO_FOUND_ERROR
+        )
+    return job
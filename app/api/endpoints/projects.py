@@ -1,11 +1,17 @@
-from typing import List
+from http import HTTPStatus
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.utilits import get_project_or_404
+from app.api.utilits import (cache_headers, get_project_for_update_or_404,
+                             get_project_or_404, is_not_modified,
+                             ndjson_response, orjson_response)
+from app.core.config import settings
+from app.core.constants import MAX_PAGE_SIZE, MAX_PROJECTS_BATCH_SIZE
 from app.core.db import get_async_session
 from app.core.user import current_superuser
+from app.core.versioning import project_version
 from app.crud.projects import charity_project_crud
 from app.schemas.charityproject import ProjectCreate, ProjectDB, ProjectUpdate
 from app.services.investment import investment_service
@@ -18,10 +24,40 @@ router = APIRouter()
     response_model=List[ProjectDB],
     response_model_exclude_none=True,
 )
-async def get_all_projects(session: AsyncSession = Depends(get_async_session)):
-    """Возвращает список всех проектов."""
-    projects = await charity_project_crud.get_multi(session)
-    return projects
+async def get_all_projects(
+        request: Request,
+        response: Response,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        after_id: Optional[int] = None,
+        stream: bool = False,
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Возвращает список всех проектов.
+    Поддерживает keyset-пагинацию (limit, after_id — id последнего
+    полученного проекта) и потоковую выдачу в NDJSON (stream=true).
+    Ответ содержит ETag версии проектов из БД; на условный запрос
+    с актуальной версией вернется 304 без чтения списка."""
+    version = await project_version.get(session)
+    headers = cache_headers(version)
+    if is_not_modified(request, version):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+    if stream:
+        projects_response = ndjson_response(
+            charity_project_crud.stream_multi(session, limit, after_id),
+            ProjectDB
+        )
+    elif settings.orjson_responses:
+        projects_response = orjson_response(
+            await charity_project_crud.get_multi_rows(
+                session, limit, after_id
+            ),
+            ProjectDB
+        )
+    else:
+        response.headers.update(headers)
+        return await charity_project_crud.get_multi(session, limit, after_id)
+    projects_response.headers.update(headers)
+    return projects_response
 
 
 @router.post(
@@ -38,6 +74,26 @@ async def create_charity_project(
     return await investment_service.create_project(session, charity_project)
 
 
+@router.post(
+    '/batch',
+    response_model=List[ProjectDB],
+    response_model_exclude_none=True,
+    dependencies=[Depends(current_superuser)],
+)
+async def create_charity_projects(
+        charity_projects: List[ProjectCreate] = Body(
+            ..., min_items=1, max_items=MAX_PROJECTS_BATCH_SIZE
+        ),
+        session: AsyncSession = Depends(get_async_session),
+):
+    """Только для суперюзеров. Создает пакет проектов и вернет их
+    в порядке создания. Имена должны быть уникальными; если хотя бы
+    одно имя занято, ни один проект не создается."""
+    return await investment_service.create_projects(
+        session, charity_projects
+    )
+
+
 @router.delete(
     '/{project_id}',
     response_model=ProjectDB,
@@ -65,6 +121,7 @@ async def update_charity_project(
 ):
     """Только для суперюзеров. Закрытый проект нельзя редактировать;
     нельзя установить требуемую сумму меньше уже вложенной."""
-    charity_project = await get_project_or_404(project_id, session)
+    charity_project, name_taken = await get_project_for_update_or_404(
+        project_id, obj_in.name, session)
     return await investment_service.update_project(
-        charity_project, obj_in, session)
+        charity_project, obj_in, session, name_taken)
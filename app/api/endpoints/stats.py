@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_async_session
+from app.crud.fund_summary import fund_summary_crud
+from app.schemas.fund_summary import FundStats
+
+router = APIRouter()
+
+
+@router.get(
+    '/',
+    response_model=FundStats,
+)
+async def get_stats(session: AsyncSession = Depends(get_async_session)):
+    """Возвращает сводные показатели фонда."""
+    summary = await fund_summary_crud.get(session)
+    return FundStats(
+        donated_amount=summary.donated_amount,
+        invested_amount=summary.invested_amount,
+        idle_amount=summary.donated_amount - summary.invested_amount,
+        projects_amount=summary.projects_amount,
+        remaining_amount=summary.projects_amount - summary.invested_amount,
+        open_projects=summary.open_projects,
+    )
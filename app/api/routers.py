@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.api.endpoints import (charity_project_router, donation_router,
-                               google_api_router, user_router)
+                               google_api_router, stats_router, user_router)
 
 main_router = APIRouter()
 main_router.include_router(user_router)
@@ -20,3 +20,8 @@ main_router.include_router(
     prefix='/google',
     tags=['Google']
 )
+main_router.include_router(
+    stats_router,
+    prefix='/stats',
+    tags=['Stats']
+)
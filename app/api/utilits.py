@@ -1,20 +1,31 @@
+from email.utils import format_datetime
 from http import HTTPStatus
+from typing import AsyncIterator, List, Mapping, Optional, Tuple, Type
 
-from fastapi import HTTPException
+import orjson
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.constants import PROJECT_NO_FOUND_ERROR
+from app.core.config import settings
+from app.core.constants import (DONATION_NO_FOUND_ERROR, NDJSON_MEDIA_TYPE,
+                                PROJECT_NO_FOUND_ERROR)
+from app.core.versioning import VersionState
+from app.crud.donations import donation_crud
 from app.crud.projects import charity_project_crud
-from app.models import CharityProject
+from app.models import CharityProject, Donation, User
 
 
 async def get_project_or_404(
     project_id: int,
     session: AsyncSession,
 ) -> CharityProject:
-    """Проверка на наличие проекта."""
+    """Проверка на наличие проекта перед изменением:
+    проект читается из БД, не из кэша."""
     charity_project = await charity_project_crud.get(
-        obj_id=project_id, session=session
+        obj_id=project_id, session=session, use_cache=False
     )
     if not charity_project:
         raise HTTPException(
@@ -22,3 +33,111 @@ async def get_project_or_404(
             detail=PROJECT_NO_FOUND_ERROR
         )
     return charity_project
+
+
+async def get_project_for_update_or_404(
+    project_id: int,
+    name: Optional[str],
+    session: AsyncSession,
+) -> Tuple[CharityProject, bool]:
+    """Проверка на наличие проекта. Вместе с проектом возвращает
+    признак того, что имя name уже занято."""
+    project_row = await charity_project_crud.get_with_name_taken(
+        obj_id=project_id, name=name, session=session
+    )
+    if not project_row:
+        raise HTTPException(
+            status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+            detail=PROJECT_NO_FOUND_ERROR
+        )
+    charity_project, name_taken = project_row
+    return charity_project, bool(name_taken)
+
+
+async def get_donation_for_user_or_404(
+    donation_id: int,
+    user: User,
+    session: AsyncSession,
+) -> Tuple[Donation, bool]:
+    """Проверка на наличие пожертвования, доступного пользователю.
+    Вместе с пожертвованием возвращает признак того, что оно
+    еще ожидает распределения."""
+    donation_row = await donation_crud.get_with_allocation_status(
+        donation_id, session
+    )
+    if donation_row is None or not (
+        user.is_superuser or donation_row[0].user_id == user.id
+    ):
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=DONATION_NO_FOUND_ERROR
+        )
+    donation, allocation_pending = donation_row
+    return donation, bool(allocation_pending)
+
+
+def cache_headers(version: VersionState) -> dict:
+    """Заголовки HTTP-кэширования для версии данных."""
+    return {
+        'ETag': version.etag,
+        'Last-Modified': format_datetime(version.modified, usegmt=True),
+        'Cache-Control': settings.projects_cache_control,
+    }
+
+
+def is_not_modified(request: Request, version: VersionState) -> bool:
+    """Проверка условного запроса по If-None-Match. If-Modified-Since
+    не учитывается: у даты точность в секунду, и два изменения
+    в одну секунду дали бы устаревший ответ 304."""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or version.etag in (
+        tag[2:] if tag.startswith('W/') else tag for tag in tags
+    )
+
+
+class NDJSONResponse(StreamingResponse):
+    """Потоковый ответ NDJSON; media_type попадает и в схему OpenAPI."""
+    media_type = NDJSON_MEDIA_TYPE
+
+
+def ndjson_response(
+    rows: AsyncIterator[dict],
+    schema: Type[BaseModel],
+    **json_kwargs,
+) -> NDJSONResponse:
+    """Потоковый ответ в формате NDJSON: по объекту схемы на строку."""
+    async def lines():
+        async for row in rows:
+            yield schema.parse_obj(row).json(
+                exclude_none=True, ensure_ascii=False, **json_kwargs
+            ) + '\n'
+
+    return NDJSONResponse(lines())
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Ответ, сериализуемый orjson. Типы, которые orjson не знает,
+    кодируются так же, как в FastAPI (jsonable_encoder)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder)
+
+
+def orjson_response(
+    rows: List[Mapping],
+    schema: Type[BaseModel],
+) -> FastJSONResponse:
+    """Быстрый ответ для списков: строки запроса сериализуются
+    без создания объектов схемы. JSON совпадает с ответом
+    через response_model с response_model_exclude_none=True."""
+    fields = list(schema.__fields__)
+    return FastJSONResponse([
+        {
+            field: row[field] for field in fields
+            if row[field] is not None
+        }
+        for row in rows
+    ])
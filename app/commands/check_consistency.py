@@ -0,0 +1,80 @@
+"""Проверка согласованности проектов и пожертвований.
+
+Проверяет, что 0 <= invested_amount <= full_amount, флаги
+fully_invested и даты закрытия соответствуют вложенным суммам,
+суммы вложенных средств проектов и пожертвований совпадают и нет
+свободных пожертвований при открытых проектах. С --ledger вложенные
+суммы сверяются с журналом распределений (только если журнал
+ведется с момента создания всех объектов). С --repair нарушения
+исправляются порциями, свободные пожертвования распределяются,
+сводка фонда пересчитывается, а отчет строится по исправленным
+данным. Если после исправления суммы вложенных средств не совпали
+бы, исправление отклоняется и данные не меняются.
+
+Запуск:
+    python -m app.commands.check_consistency [--ledger] [--repair]
+"""
+import argparse
+import asyncio
+import sys
+
+from app.services.consistency import ConsistencyChecker
+
+
+def print_progress(table: str, rows: int, rows_per_second: float) -> None:
+    print(f'{table}: {rows} строк ({rows_per_second:.0f} строк/с)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--ledger', action='store_true',
+        help='сверять вложенные суммы с журналом распределений'
+    )
+    parser.add_argument(
+        '--repair', action='store_true',
+        help='исправить найденные нарушения'
+    )
+    arguments = parser.parse_args()
+    report = asyncio.run(ConsistencyChecker(
+        repair=arguments.repair,
+        use_ledger=arguments.ledger,
+        progress=print_progress,
+    ).run())
+    for table in report.tables:
+        for violation, count in table.violations.items():
+            print(f'{table.table}: {violation} — {count}')
+        if table.repaired:
+            print(f'{table.table}: исправлено строк — {table.repaired}')
+    if not report.balanced:
+        print(
+            'Суммы вложенных средств не совпадают: ' +
+            ', '.join(
+                f'{table.table} {table.invested_amount}'
+                for table in report.tables
+            ) +
+            (
+                f', журнал {report.ledger_invested_amount}'
+                if report.ledger_invested_amount is not None else ''
+            )
+        )
+    if report.repair_refused:
+        print(
+            'Исправление отклонено: после него суммы вложенных средств '
+            'не совпали бы. Данные не изменены.'
+        )
+    if report.idle_with_open_projects:
+        print('Есть свободные пожертвования при открытых проектах.')
+    if report.reallocated_amount:
+        print(f'Распределено заново: {report.reallocated_amount}.')
+    print(
+        f'Проверено за {report.seconds:.2f} с '
+        f'({report.rows_per_second:.0f} строк/с).'
+    )
+    if report.consistent:
+        print('Нарушений не найдено.')
+    sys.exit(0 if report.consistent else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Импорт пожертвований из CSV.
+
+Колонки файла: full_amount, comment, user_id, create_date.
+Пустой user_id заменяется значением --user-id.
+
+Запуск:
+    python -m app.commands.import_donations donations.csv --user-id 1
+    python -m app.commands.import_donations donations.csv --user-id 1 \
+        --dry-run
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.db import AsyncSessionLocal
+from app.schemas.donation import DonationImportReport
+from app.services.donation_import import import_donations
+
+
+async def run(path: str, user_id: int, dry_run: bool) -> DonationImportReport:
+    async with AsyncSessionLocal() as session:
+        with open(path, 'rb') as csv_file:
+            return await import_donations(
+                session, csv_file, user_id, dry_run
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help='путь к CSV-файлу')
+    parser.add_argument(
+        '--user-id', type=int, required=True,
+        help='пользователь для строк без user_id'
+    )
+    parser.add_argument(
+        '--dry-run', action='store_true',
+        help='только проверить файл'
+    )
+    arguments = parser.parse_args()
+    report = asyncio.run(
+        run(arguments.path, arguments.user_id, arguments.dry_run)
+    )
+    for error in report.errors:
+        print(f'строка {error.line}: {error.error}')
+    print(
+        f'{"Проверено" if report.dry_run else "Импортировано"} '
+        f'{report.rows} строк на сумму {report.donated_amount}, '
+        f'распределено {report.invested_amount} '
+        f'за {report.seconds:.2f} с ({report.rows_per_second:.0f} строк/с).'
+    )
+    sys.exit(1 if report.errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Пересчет сводки фонда по таблицам.
+
+Сравнивает сохраненную сводку с полным пересчетом, выводит
+расхождения и сохраняет пересчитанные значения.
+
+Запуск:
+    python -m app.commands.rebuild_fund_summary [--check]
+"""
+import argparse
+import asyncio
+import sys
+
+from app.core.db import AsyncSessionLocal
+from app.crud.fund_summary import SUMMARY_ID, fund_summary_crud
+from app.models import FundSummary
+
+
+async def rebuild(check_only: bool) -> bool:
+    """Возвращает True, если сохраненная сводка совпала с пересчетом."""
+    async with AsyncSessionLocal() as session:
+        stored = await session.get(FundSummary, SUMMARY_ID)
+        actual = await fund_summary_crud.scan(session)
+        consistent = stored is not None
+        for field, value in actual.items():
+            stored_value = getattr(stored, field, None)
+            if stored_value != value:
+                consistent = False
+                print(f'{field}: сохранено {stored_value}, по таблицам {value}')
+        if consistent:
+            print('Сводка совпадает с таблицами.')
+        elif not check_only:
+            await fund_summary_crud.rebuild(session)
+            print('Сводка пересчитана.')
+    return consistent
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--check', action='store_true',
+        help='только сравнить, не сохраняя пересчет'
+    )
+    arguments = parser.parse_args()
+    consistent = asyncio.run(rebuild(arguments.check))
+    sys.exit(0 if consistent or not arguments.check else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,7 +6,40 @@ from pydantic import BaseSettings
 class Settings(BaseSettings):
     app_title: str = ' Поможем котикам!'
     database_url: str = 'sqlite+aiosqlite:///./fastapi.db'
+    pool_size: int = 10
+    pool_max_overflow: int = 20
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 500
+    sqlite_journal_mode: str = 'WAL'
+    sqlite_synchronous: str = 'NORMAL'
+    sqlite_busy_timeout: int = 5000
+    sqlite_cache_size: int = -64000
     secret: str = 'SECRET'
+    auth_cache_size: int = 10000
+    auth_cache_ttl: float = 60
+    password_hash_executor: str = 'thread'
+    password_hash_workers: int = 4
+    password_hash_concurrency: int = 4
+    async_allocation: bool = False
+    allocation_worker: bool = True
+    orjson_responses: bool = False
+    projects_cache_control: str = 'public, no-cache'
+    project_cache_size: int = 0
+    project_cache_ttl: float = 60
+    allocation_batch_size: int = 100
+    allocation_poll_interval: float = 1.0
+    allocation_max_attempts: int = 5
+    allocation_retry_delay: float = 5
+    report_worker: bool = True
+    report_concurrency: int = 2
+    report_max_attempts: int = 5
+    report_retry_delay: float = 5
+    report_poll_interval: float = 1.0
+    report_lease_seconds: float = 60
+    google_discovery_cache_ttl: float = 86400
+    google_discovery_cache_dir: Optional[str] = None
     type: Optional[str] = None
     project_id: Optional[str] = None
     private_key_id: Optional[str] = None
@@ -6,4 +6,28 @@ PROJECT_NO_FOUND_ERROR = 'Проект не найден.'
 PROJECT_NAME_ERROR = 'Проект с таким именем уже существует!'
 INVESTED_AMOUNT_EXIST_ERROR = 'В проект были внесены средства, не подлежит удалению!'
 FULL_AMOUNT_ERROR = 'Требуемая сумма проекта не может быть меньше вложенной!'
-PROJECT_CLOSE_ERROR = 'Нельзя изменять закрытый проект.'
\ No newline at end of file
+PROJECT_NAME_DUPLICATE_ERROR = 'Имена проектов в запросе должны быть уникальными!'
+PROJECT_CLOSE_ERROR = 'Нельзя изменять закрытый проект.'
+DONATION_NO_FOUND_ERROR = 'Пожертвование не найдено.'
+USER_NO_FOUND_ERROR = 'Пользователь {} не найден.'
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+ALLOCATION_CHUNK_SIZE = 500
+ALLOCATION_LOCK_KEY = 7301
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 100
+IMPORT_FILE_ERROR = 'Файл не читается как CSV в UTF-8: {}'
+IMPORT_EXTRA_FIELDS_ERROR = 'В строке больше полей, чем в заголовке.'
+MAX_PROJECTS_BATCH_SIZE = 1000
+CONSISTENCY_BATCH_SIZE = 1000
+MAX_LEN_REPORT_STATUS = 20
+MAX_LEN_TABLE_NAME = 64
+REPORT_STATUS_PENDING = 'pending'
+REPORT_STATUS_RUNNING = 'running'
+REPORT_STATUS_DONE = 'done'
+REPORT_STATUS_FAILED = 'failed'
+REPORT_SPREADSHEET_URL = 'https://docs.google.com/spreadsheets/d/{}'
+REPORT_JOB_NO_FOUND_ERROR = 'Задача формирования отчета не найдена.'
+REPORT_LEASE_EXPIRED_ERROR = 'Аренда задачи истекла.'
+REPORT_PAGE_SIZE = 1000
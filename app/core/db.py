@@ -1,6 +1,11 @@
-from sqlalchemy import Column, Integer
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import Column, Integer, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, declared_attr, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
@@ -16,7 +21,71 @@ class PreBase:
 
 Base = declarative_base(cls=PreBase)
 
-engine = create_async_engine(settings.database_url)
+
+def get_engine_options(database_url: str) -> dict:
+    """Параметры движка и пула соединений из настроек.
+    Для файловой SQLite вместо NullPool используется пул,
+    чтобы PRAGMA и кэш страниц жили дольше одного запроса."""
+    url = make_url(database_url)
+    options = {
+        'query_cache_size': settings.statement_cache_size,
+        'pool_pre_ping': settings.pool_pre_ping,
+        'pool_size': settings.pool_size,
+        'max_overflow': settings.pool_max_overflow,
+        'pool_timeout': settings.pool_timeout,
+        'pool_recycle': settings.pool_recycle,
+    }
+    if url.get_backend_name() == 'sqlite':
+        if url.database in (None, '', ':memory:'):
+            return {'query_cache_size': settings.statement_cache_size}
+        options['poolclass'] = AsyncAdaptedQueuePool
+    if url.get_driver_name() == 'asyncpg':
+        options['connect_args'] = {
+            'prepared_statement_cache_size': settings.statement_cache_size
+        }
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Настройка каждого нового соединения SQLite."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f'PRAGMA journal_mode={settings.sqlite_journal_mode}')
+    cursor.execute(f'PRAGMA synchronous={settings.sqlite_synchronous}')
+    cursor.execute(f'PRAGMA busy_timeout={settings.sqlite_busy_timeout}')
+    cursor.execute(f'PRAGMA cache_size={settings.sqlite_cache_size}')
+    cursor.close()
+
+
+def make_engine(database_url: str):
+    """Создание асинхронного движка с настройками из Settings."""
+    async_engine = create_async_engine(
+        database_url, **get_engine_options(database_url)
+    )
+    if async_engine.dialect.name == 'sqlite':
+        event.listen(async_engine.sync_engine, 'connect', set_sqlite_pragmas)
+    return async_engine
+
+
+def get_dialect_name(session: AsyncSession) -> str:
+    """Имя диалекта БД сессии: 'sqlite' или 'postgresql'."""
+    return session.bind.dialect.name
+
+
+@contextmanager
+def keep_loaded_on_commit(session: AsyncSession) -> Iterator[None]:
+    """Commit внутри блока не сбрасывает загруженные атрибуты
+    объектов: только что записанные значения не перечитываются
+    отдельным SELECT."""
+    sync_session = session.sync_session
+    expire_on_commit = sync_session.expire_on_commit
+    sync_session.expire_on_commit = False
+    try:
+        yield
+    finally:
+        sync_session.expire_on_commit = expire_on_commit
+
+
+engine = make_engine(settings.database_url)
 
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession)
 
@@ -1,7 +1,12 @@
+from typing import Optional
+
 from aiogoogle import Aiogoogle
 from aiogoogle.auth.creds import ServiceAccountCreds
+from aiogoogle.resource import GoogleAPI
+from aiogoogle.sessions.aiohttp_session import AiohttpSession
 
 from app.core.config import settings
+from app.crud.cache import CacheBackend, FileCache, LayeredCache, LocalCache
 
 SCOPES = [
     'https://www.googleapis.com/auth/spreadsheets',
@@ -24,6 +29,79 @@ INFO = {
 cred = ServiceAccountCreds(scopes=SCOPES, **INFO)
 
 
+class SharedSession(AiohttpSession):
+    """Сессия aiohttp, которую не закрывает выход из async with:
+    aiogoogle открывает и закрывает сессию на каждый запрос
+    и обновление токена, а общая сессия закрывается только close()."""
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+class GoogleClient(Aiogoogle):
+    """
+    Клиент Google API для всего процесса: все запросы идут через
+    одну сессию aiohttp (пул соединений), документы discovery
+    кэшируются в discovery_cache. Сессия создается при первом
+    запросе и закрывается close() при остановке приложения.
+    """
+
+    def __init__(
+            self,
+            *args,
+            discovery_cache: Optional[CacheBackend] = None,
+            session_class=SharedSession,
+            **kwargs,
+    ):
+        self._session_class = session_class
+        self._session = None
+        self.discovery_cache = discovery_cache
+        self.discoveries = 0
+        super().__init__(*args, session_factory=self._shared_session, **kwargs)
+
+    def _shared_session(self):
+        if self._session is None or self._session.closed:
+            self._session = self._session_class()
+        return self._session
+
+    async def discover(
+            self,
+            api_name: str,
+            api_version: Optional[str] = None,
+            validate: bool = False,
+    ) -> GoogleAPI:
+        if self.discovery_cache is None or api_version is None:
+            return await super().discover(api_name, api_version, validate)
+        key = f'discovery:{api_name}:{api_version}'
+        document = await self.discovery_cache.get(key)
+        if document is not None:
+            return GoogleAPI(document, validate)
+        self.discoveries += 1
+        service = await super().discover(api_name, api_version, validate)
+        await self.discovery_cache.set(key, service.discovery_document)
+        return service
+
+    async def close(self) -> None:
+        """Закрыть общую сессию."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+def make_discovery_cache() -> CacheBackend:
+    memory = LocalCache(16, settings.google_discovery_cache_ttl)
+    if settings.google_discovery_cache_dir is None:
+        return memory
+    return LayeredCache(memory, FileCache(
+        settings.google_discovery_cache_dir,
+        settings.google_discovery_cache_ttl,
+    ))
+
+
+google_client = GoogleClient(
+    service_account_creds=cred, discovery_cache=make_discovery_cache()
+)
+
+
 async def get_service():
-    async with Aiogoogle(service_account_creds=cred) as aiogoogle:
-        yield aiogoogle
+    yield google_client
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from concurrent.futures import (Executor, ProcessPoolExecutor,
+                                ThreadPoolExecutor)
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+from weakref import WeakKeyDictionary
+
+from fastapi_users.password import PasswordHelper
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+T = TypeVar('T')
+
+crypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+
+
+def hash_password(password: str) -> str:
+    return crypt_context.hash(password)
+
+
+def verify_and_update_password(
+        plain_password: str,
+        hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    return crypt_context.verify_and_update(plain_password, hashed_password)
+
+
+class ExecutorPasswordHelper(PasswordHelper):
+    """
+    Хеширование и проверка паролей (bcrypt) вне event loop.
+    Вычисления выполняются в пуле потоков или процессов
+    (executor: thread, process; inline — в event loop, как раньше),
+    одновременно не больше concurrency задач, остальные ждут
+    в очереди. Метрики очереди доступны через metrics().
+    """
+
+    def __init__(
+            self,
+            executor: str = 'thread',
+            workers: int = 4,
+            concurrency: int = 4,
+    ):
+        super().__init__(crypt_context)
+        self.executor = executor
+        self._workers = workers
+        self._concurrency = concurrency
+        self._pool: Optional[Executor] = None
+        self._semaphores = WeakKeyDictionary()
+        self._waiting = 0
+        self._running = 0
+        self._completed = 0
+        self._max_waiting = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _get_pool(self) -> Optional[Executor]:
+        if self.executor == 'inline':
+            return None
+        if self._pool is None:
+            pool_class = (
+                ProcessPoolExecutor if self.executor == 'process'
+                else ThreadPoolExecutor
+            )
+            self._pool = pool_class(max_workers=self._workers)
+        return self._pool
+
+    async def _run(self, function: Callable[..., T], *args) -> T:
+        pool = self._get_pool()
+        if pool is None:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(
+                self._concurrency
+            )
+        queued = time.perf_counter()
+        if semaphore.locked():
+            # Ждущей считается только задача, которой не хватило
+            # свободного места в пуле.
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+            try:
+                await semaphore.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await semaphore.acquire()
+        started = time.perf_counter()
+        self._wait_seconds += started - queued
+        self._running += 1
+        try:
+            return await loop.run_in_executor(
+                pool, function, *args
+            )
+        finally:
+            semaphore.release()
+            self._running -= 1
+            self._completed += 1
+            self._run_seconds += time.perf_counter() - started
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update_async(
+            self,
+            plain_password: str,
+            hashed_password: str,
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(
+            verify_and_update_password, plain_password, hashed_password
+        )
+
+    def metrics(self) -> Dict[str, float]:
+        """Метрики очереди хеширования."""
+        return {
+            'waiting': self._waiting,
+            'running': self._running,
+            'completed': self._completed,
+            'max_waiting': self._max_waiting,
+            'avg_wait_seconds': (
+                self._wait_seconds / self._completed if self._completed else 0
+            ),
+            'avg_run_seconds': (
+                self._run_seconds / self._completed if self._completed else 0
+            ),
+        }
+
+    def shutdown(self) -> None:
+        """Остановка пула."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+password_helper = ExecutorPasswordHelper(
+    executor=settings.password_hash_executor,
+    workers=settings.password_hash_workers,
+    concurrency=settings.password_hash_concurrency,
+)
@@ -1,18 +1,31 @@
-from typing import Optional, Union
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
 
+import jwt
 from fastapi import Depends, Request
+from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_users import (BaseUserManager, FastAPIUsers, IntegerIDMixin,
-                           InvalidPasswordException)
+                           InvalidPasswordException, exceptions)
 from fastapi_users.authentication import (AuthenticationBackend,
-                                          BearerTransport, JWTStrategy)
+                                          Authenticator, BearerTransport,
+                                          JWTStrategy)
+from fastapi_users.jwt import decode_jwt, generate_jwt
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.db import get_async_session
+from app.core.password import password_helper
+from app.crud.cache import LocalCache
 from app.models import User
 from app.schemas.user import UserCreate
 
+JWT_LIFETIME_SECONDS = 3600
+# Изменение этих полей отзывает выпущенные токены пользователя.
+REVOKING_FIELDS = {'password', 'email', 'is_active', 'is_superuser'}
+
 
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     yield SQLAlchemyUserDatabase(session, User)
@@ -21,8 +34,121 @@ async def get_user_db(session: AsyncSession = Depends(get_async_session)):
 bearer_transport = BearerTransport(tokenUrl='auth/jwt/login')
 
 
+class CachedJWTStrategy(JWTStrategy):
+    """
+    JWT-стратегия с кэшем проверенных токенов. Токен дополнительно
+    содержит iat. Проверенный токен сопоставляется со снимком
+    пользователя (без hashed_password), повторные запросы с тем же
+    токеном в течение auth_cache_ttl не обращаются к БД.
+    При промахе кэша пользователь загружается из БД, и токен,
+    выпущенный раньше user.token_valid_after, отклоняется: так
+    отзыв токенов виден всем процессам. invalidate_user только
+    ускоряет отзыв в текущем процессе, очищая его снимки.
+    """
+
+    def __init__(self, *args, cache: Optional[LocalCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache = cache
+        self._changed_at: Dict[int, float] = {}
+
+    async def write_token(self, user: User) -> str:
+        data = {
+            'user_id': str(user.id),
+            'aud': self.token_audience,
+            'iat': time.time(),
+        }
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds,
+            algorithm=self.algorithm
+        )
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Отметить изменение пользователя в текущем процессе."""
+        self._changed_at[user_id] = time.time()
+
+    def _is_stale(self, user_id: int, issued_at: float) -> bool:
+        return self._changed_at.get(user_id, -1) >= issued_at
+
+    @staticmethod
+    def _is_revoked(user: User, issued_at: float) -> bool:
+        valid_after = user.token_valid_after
+        return valid_after is not None and (
+            datetime.utcfromtimestamp(issued_at) < valid_after
+        )
+
+    async def _cached_user(self, token: str) -> Optional[User]:
+        entry = await self._cache.get(token)
+        if entry is None:
+            return None
+        snapshot, cached_at, expires = entry
+        if expires is not None and expires <= time.time():
+            await self._cache.delete(token)
+            return None
+        if self._is_stale(snapshot['id'], cached_at):
+            await self._cache.delete(token)
+            return None
+        return User(**snapshot)
+
+    async def _remember(
+            self,
+            token: str,
+            user: User,
+            data: Dict[str, Any],
+    ) -> User:
+        snapshot = {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+            if attr.key != 'hashed_password'
+        }
+        await self._cache.set(
+            token, (snapshot, time.time(), data.get('exp'))
+        )
+        return User(**snapshot)
+
+    async def read_token(
+            self,
+            token: Optional[str],
+            user_manager: BaseUserManager[User, int],
+    ) -> Optional[User]:
+        if token is None:
+            return None
+        if self._cache is not None:
+            user = await self._cached_user(token)
+            if user is not None:
+                return user
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience,
+                algorithms=[self.algorithm]
+            )
+            user_id = user_manager.parse_id(data['user_id'])
+            user = await user_manager.get(user_id)
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID,
+                exceptions.UserNotExists):
+            return None
+        if self._is_revoked(user, data.get('iat', 0)):
+            return None
+        if self._cache is None:
+            return user
+        return await self._remember(token, user, data)
+
+
+jwt_strategy = CachedJWTStrategy(
+    secret=settings.secret, lifetime_seconds=JWT_LIFETIME_SECONDS
+)
+cached_jwt_strategy = CachedJWTStrategy(
+    secret=settings.secret,
+    lifetime_seconds=JWT_LIFETIME_SECONDS,
+    cache=LocalCache(settings.auth_cache_size, settings.auth_cache_ttl),
+)
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=settings.secret, lifetime_seconds=3600)
+    return jwt_strategy
+
+
+def get_cached_jwt_strategy() -> JWTStrategy:
+    return cached_jwt_strategy
 
 
 auth_backend = AuthenticationBackend(
@@ -30,9 +156,78 @@ auth_backend = AuthenticationBackend(
     transport=bearer_transport,
     get_strategy=get_jwt_strategy,
 )
+cached_auth_backend = AuthenticationBackend(
+    name='jwt',
+    transport=bearer_transport,
+    get_strategy=get_cached_jwt_strategy,
+)
 
 
 class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
+    """
+    Менеджер пользователей. Хеширование и проверка паролей (bcrypt)
+    выполняются через password_helper вне event loop, поэтому
+    массовые входы не задерживают остальные запросы.
+    """
+    def __init__(self, user_db: SQLAlchemyUserDatabase):
+        super().__init__(user_db, password_helper)
+
+    async def create(
+            self,
+            user_create: UserCreate,
+            safe: bool = False,
+            request: Optional[Request] = None,
+    ) -> User:
+        await self.validate_password(user_create.password, user_create)
+        if await self.user_db.get_by_email(user_create.email) is not None:
+            raise exceptions.UserAlreadyExists()
+        user_dict = (
+            user_create.create_update_dict() if safe
+            else user_create.create_update_dict_superuser()
+        )
+        user_dict['hashed_password'] = await self.password_helper.hash_async(
+            user_dict.pop('password')
+        )
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def authenticate(
+            self,
+            credentials: OAuth2PasswordRequestForm,
+    ) -> Optional[User]:
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Хеширование выравнивает время ответа (защита от timing attack).
+            await self.password_helper.hash_async(credentials.password)
+            return None
+        verified, updated_hash = (
+            await self.password_helper.verify_and_update_async(
+                credentials.password, user.hashed_password
+            )
+        )
+        if not verified:
+            return None
+        if updated_hash is not None:
+            await self.user_db.update(user, {'hashed_password': updated_hash})
+        return user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        if REVOKING_FIELDS & update_dict.keys():
+            # Токены, выпущенные до изменения, отклоняются всеми
+            # процессами при следующей проверке по БД.
+            update_dict = dict(
+                update_dict, token_valid_after=datetime.utcnow()
+            )
+        if 'password' in update_dict:
+            update_dict = dict(update_dict)
+            password = update_dict.pop('password')
+            await self.validate_password(password, user)
+            update_dict['hashed_password'] = (
+                await self.password_helper.hash_async(password)
+            )
+        return await super()._update(user, update_dict)
 
     async def validate_password(
         self,
@@ -48,6 +243,19 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
                 reason='Password should not contain e-mail'
             )
 
+    async def on_after_update(
+            self,
+            user: User,
+            update_dict: Dict[str, Any],
+            request: Optional[Request] = None,
+    ):
+        cached_jwt_strategy.invalidate_user(user.id)
+
+    async def on_after_verify(
+            self, user: User, request: Optional[Request] = None
+    ):
+        cached_jwt_strategy.invalidate_user(user.id)
+
     async def on_after_register(
             self, user: User, request: Optional[Request] = None
     ):
@@ -63,5 +271,9 @@ fastapi_users = FastAPIUsers[User, int](
     [auth_backend],
 )
 
-current_user = fastapi_users.current_user(active=True)
-current_superuser = fastapi_users.current_user(active=True, superuser=True)
+# Роутеры fastapi_users (users/me и др.) получают пользователя из БД,
+# эндпоинты приложения — через кэш проверенных токенов.
+authenticator = Authenticator([cached_auth_backend], get_user_manager)
+
+current_user = authenticator.current_user(active=True)
+current_superuser = authenticator.current_user(active=True, superuser=True)
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.table_version import TableVersion
+
+
+class VersionState(NamedTuple):
+    etag: str
+    modified: datetime
+
+
+class ChangeVersion:
+    """
+    Версия таблицы, хранящаяся в БД (TableVersion). Изменяющий код
+    отмечает сессию (touch), перед commit этой сессии версия
+    увеличивается в той же транзакции. Поэтому изменения, сделанные
+    другими процессами и CLI-командами, тоже меняют ETag, а откат
+    транзакции версию не меняет.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._key = f'{name}_changed'
+        event.listen(Session, 'before_commit', self._before_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def touch(self, session) -> None:
+        """Отметить, что в транзакции сессии таблица изменена."""
+        getattr(session, 'sync_session', session).info[self._key] = True
+
+    async def get(self, session: AsyncSession) -> VersionState:
+        """Текущая версия таблицы: один запрос по ключу."""
+        version, modified = (await session.execute(
+            select(TableVersion.version, TableVersion.modified).where(
+                TableVersion.name == self.name
+            )
+        )).one()
+        return VersionState(
+            f'"{version}"', modified.replace(tzinfo=timezone.utc)
+        )
+
+    def _before_commit(self, session: Session) -> None:
+        # Для AsyncSession событие вызывается внутри greenlet,
+        # поэтому синхронный execute здесь допустим.
+        if session.info.pop(self._key, False):
+            session.execute(
+                update(TableVersion).where(
+                    TableVersion.name == self.name
+                ).values(
+                    version=TableVersion.version + 1,
+                    modified=datetime.utcnow(),
+                )
+            )
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(self._key, None)
+
+
+project_version = ChangeVersion('charityproject')
@@ -1,8 +1,9 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.constants import STREAM_CHUNK_SIZE
 from app.models import User
 
 
@@ -12,26 +13,97 @@ class CRUDBase:
     def __init__(self, model):
         self.model = model
 
+    async def _after_create(
+            self,
+            db_obj,
+            session: AsyncSession,
+    ) -> None:
+        """Действия после создания объекта в той же транзакции."""
+
+    def _paginate(
+            self,
+            query,
+            limit: Optional[int] = None,
+            after_id: Optional[int] = None,
+    ):
+        """Keyset-пагинация по id: объекты после after_id,
+        не более limit штук."""
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        query = query.order_by(self.model.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
     async def get_multi(
             self,
-            session: AsyncSession
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            after_id: Optional[int] = None,
     ):
         """Функция отображения всех объектов модели."""
-        db_objs = await session.execute(select(self.model))
+        db_objs = await session.execute(
+            self._paginate(select(self.model), limit, after_id)
+        )
         return db_objs.scalars().all()
 
+    async def get_multi_rows(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            after_id: Optional[int] = None,
+    ):
+        """Функция получения всех объектов модели строками таблицы,
+        без создания ORM-объектов."""
+        rows = await session.execute(
+            self._paginate(select(self.model.__table__), limit, after_id)
+        )
+        return rows.mappings().all()
+
+    async def _stream_rows(
+            self,
+            query,
+            session: AsyncSession,
+    ) -> AsyncIterator[dict]:
+        """Построчная выдача результатов запроса через серверный курсор,
+        без создания ORM-объектов и полного списка в памяти."""
+        result = await session.stream(query)
+        async for partition in result.mappings().partitions(
+                STREAM_CHUNK_SIZE):
+            for row in partition:
+                yield row
+
+    def stream_multi(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            after_id: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """Функция потоковой выдачи всех объектов модели."""
+        return self._stream_rows(
+            self._paginate(select(self.model.__table__), limit, after_id),
+            session
+        )
+
     async def create(
             self,
             obj_in,
             session: AsyncSession,
             user: Optional[User] = None,
+            commit: bool = True,
     ):
-        """Функция создания объекта модели."""
+        """Функция создания объекта модели.
+        При commit=False объект только отправляется в БД (flush)
+        в рамках текущей транзакции."""
         obj_in_data = obj_in.dict()
         if user is not None:
             obj_in_data['user_id'] = user.id
         db_obj = self.model(**obj_in_data)
         session.add(db_obj)
+        await session.flush()
+        await self._after_create(db_obj, session)
+        if not commit:
+            return db_obj
         await session.commit()
         await session.refresh(db_obj)
         return db_obj
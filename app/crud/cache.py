@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional
+
+DATETIME_KEY = '__datetime__'
+
+
+class CacheBackend(ABC):
+    """Интерфейс хранилища кэша. Значения — простые данные
+    (словари, числа, строки, даты), не ORM-объекты."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Значение по ключу или None."""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any) -> None:
+        """Сохранить значение."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Удалить значения."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Удалить все значения."""
+
+
+class LocalCache(CacheBackend):
+    """Кэш в памяти процесса: не более max_size значений (LRU),
+    каждое хранится не дольше ttl секунд."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._values: OrderedDict = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._values[key]
+            return None
+        self._values.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        self._values[key] = (time.monotonic() + self._ttl, value)
+        self._values.move_to_end(key)
+        while len(self._values) > self._max_size:
+            self._values.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._values.pop(key, None)
+
+    async def clear(self) -> None:
+        self._values.clear()
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {DATETIME_KEY: value.isoformat()}
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def _from_json(data: dict) -> Any:
+    if data.keys() == {DATETIME_KEY}:
+        return datetime.fromisoformat(data[DATETIME_KEY])
+    return data
+
+
+class RedisCache(CacheBackend):
+    """Общий кэш для нескольких процессов. Принимает асинхронный
+    клиент с интерфейсом Redis (get, set с ex, delete, scan_iter),
+    например redis.asyncio.Redis. Значения хранятся в JSON
+    (даты — в ISO 8601): данные общего хранилища не исполняются
+    при чтении, в отличие от pickle."""
+
+    def __init__(self, client, ttl: float, prefix: str = 'cache:'):
+        self._client = client
+        self._ttl = ttl
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self._client.get(self._prefix + key)
+        if value is None:
+            return None
+        return json.loads(value, object_hook=_from_json)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self._client.set(
+            self._prefix + key,
+            json.dumps(value, default=_to_json),
+            ex=max(1, int(self._ttl)),
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._client.delete(*(self._prefix + key for key in keys))
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(
+            match=self._prefix + '*'
+        )]
+        if keys:
+            await self._client.delete(*keys)
+
+
+class FileCache(CacheBackend):
+    """Кэш в файлах каталога directory: значение хранится не дольше
+    ttl секунд с момента записи. Сохраняется после перезапуска
+    и общий для процессов одной машины."""
+
+    def __init__(self, directory: str, ttl: float):
+        self._directory = directory
+        self._ttl = ttl
+
+    def _path(self, key: str) -> str:
+        return os.path.join(
+            self._directory, hashlib.sha256(key.encode()).hexdigest()
+        )
+
+    async def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self._ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    async def set(self, key: str, value: Any) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            pickle.dump(value, file)
+        os.replace(temp_path, path)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    async def clear(self) -> None:
+        if not os.path.isdir(self._directory):
+            return
+        for name in os.listdir(self._directory):
+            os.remove(os.path.join(self._directory, name))
+
+
+class LayeredCache(CacheBackend):
+    """Несколько хранилищ по порядку (например, память, затем диск).
+    Значение, найденное в следующем хранилище, копируется
+    в предыдущие."""
+
+    def __init__(self, *backends: CacheBackend):
+        self._backends = backends
+
+    async def get(self, key: str) -> Optional[Any]:
+        for index, backend in enumerate(self._backends):
+            value = await backend.get(key)
+            if value is not None:
+                for previous in self._backends[:index]:
+                    await previous.set(key, value)
+                return value
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        for backend in self._backends:
+            await backend.set(key, value)
+
+    async def delete(self, *keys: str) -> None:
+        for backend in self._backends:
+            await backend.delete(*keys)
+
+    async def clear(self) -> None:
+        for backend in self._backends:
+            await backend.clear()
@@ -1,23 +1,63 @@
+from datetime import datetime
+from typing import Optional
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud.base import CRUDBase
-from app.models import Donation, User
+from app.crud.fund_summary import fund_summary_crud
+from app.models import AllocationTask, Donation, User
 
 
 class CRUDDonation(CRUDBase):
     """Класс CRUD для пожертвований."""
 
+    async def _after_create(
+        self,
+        db_obj: Donation,
+        session: AsyncSession,
+    ) -> None:
+        """Учет пожертвования в сводке фонда."""
+        await fund_summary_crud.apply(
+            session, donated_amount=db_obj.full_amount
+        )
+
     async def get_multi_donations_current_user(
         self,
         user: User,
         session: AsyncSession,
+        limit: Optional[int] = None,
+        after_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
     ):
-        """Функция отображения пожертвований пользователя."""
+        """Функция отображения пожертвований пользователя.
+        Поддерживает keyset-пагинацию и фильтр по дате создания."""
+        query = select(self.model).where(Donation.user_id == user.id)
+        if created_from is not None:
+            query = query.where(Donation.create_date >= created_from)
+        if created_to is not None:
+            query = query.where(Donation.create_date < created_to)
         db_obj = await session.execute(
-            select(self.model).where(Donation.user_id == user.id)
+            self._paginate(query, limit, after_id)
         )
         return db_obj.scalars().all()
 
+    async def get_with_allocation_status(
+        self,
+        obj_id: int,
+        session: AsyncSession,
+    ):
+        """Функция получения пожертвования и признака того,
+        что оно ожидает распределения в outbox."""
+        db_obj = await session.execute(
+            select(
+                self.model, AllocationTask.id.isnot(None)
+            ).outerjoin(
+                AllocationTask, AllocationTask.donation_id == self.model.id
+            ).where(self.model.id == obj_id)
+        )
+        return db_obj.first()
+
 
 donation_crud = CRUDDonation(Donation)
@@ -0,0 +1,100 @@
+from sqlalchemy import case, func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_dialect_name
+from app.models import CharityProject, Donation, FundSummary
+
+SUMMARY_ID = 1
+
+
+class CRUDFundSummary:
+    """Класс CRUD для сводных показателей фонда."""
+
+    def __init__(self, model):
+        self.model = model
+
+    async def get(
+            self,
+            session: AsyncSession
+    ) -> FundSummary:
+        """Функция получения сводки. Если строки еще нет,
+        она строится полным пересчетом."""
+        summary = await session.get(self.model, SUMMARY_ID)
+        if summary is None:
+            summary = await self.rebuild(session)
+        return summary
+
+    async def apply(
+            self,
+            session: AsyncSession,
+            **deltas: int
+    ) -> None:
+        """Функция инкрементального изменения сводки
+        в рамках текущей транзакции. Строка сводки создается
+        миграцией; если ее нет (база из create_all), изменение
+        пропускается: get построит сводку полным пересчетом,
+        который уже учитывает это изменение."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        table = self.model.__table__
+        await session.execute(
+            update(table).where(table.c.id == SUMMARY_ID).values({
+                field: table.c[field] + delta
+                for field, delta in deltas.items()
+            })
+        )
+
+    async def scan(
+            self,
+            session: AsyncSession
+    ) -> dict:
+        """Функция полного пересчета сводки по таблицам."""
+        donated_amount, invested_amount = (await session.execute(
+            select(
+                func.coalesce(func.sum(Donation.full_amount), 0),
+                func.coalesce(func.sum(Donation.invested_amount), 0),
+            )
+        )).one()
+        projects_amount, open_projects = (await session.execute(
+            select(
+                func.coalesce(func.sum(CharityProject.full_amount), 0),
+                func.coalesce(func.sum(case(
+                    (CharityProject.fully_invested.is_(False), 1), else_=0
+                )), 0),
+            )
+        )).one()
+        return {
+            'donated_amount': donated_amount,
+            'invested_amount': invested_amount,
+            'projects_amount': projects_amount,
+            'open_projects': open_projects,
+        }
+
+    async def rebuild(
+            self,
+            session: AsyncSession
+    ) -> FundSummary:
+        """Функция пересчета сводки по таблицам с сохранением.
+        Строка записывается через INSERT ... ON CONFLICT DO UPDATE,
+        поэтому одновременные пересчеты не конфликтуют по id."""
+        values = await self.scan(session)
+        insert = (
+            postgresql.insert if get_dialect_name(session) == 'postgresql'
+            else sqlite.insert
+        )
+        statement = insert(self.model.__table__).values(
+            id=SUMMARY_ID, **values
+        )
+        await session.execute(statement.on_conflict_do_update(
+            index_elements=['id'],
+            set_={field: statement.excluded[field] for field in values},
+        ))
+        await session.commit()
+        return await session.get(
+            self.model, SUMMARY_ID, populate_existing=True
+        )
+
+
+fund_summary_crud = CRUDFundSummary(FundSummary)
@@ -0,0 +1,40 @@
+from typing import AsyncIterator
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models import Investment
+
+
+class CRUDInvestment(CRUDBase):
+    """Класс CRUD для журнала распределений."""
+
+    def stream_by_donation(
+            self,
+            donation_id: int,
+            session: AsyncSession,
+    ) -> AsyncIterator[dict]:
+        """Функция потоковой выдачи распределений пожертвования
+        в порядке их выполнения."""
+        table = Investment.__table__
+        return self._stream_rows(
+            select(table).where(
+                table.c.donation_id == donation_id
+            ).order_by(table.c.id),
+            session
+        )
+
+    async def get_invested_amount(
+            self,
+            session: AsyncSession,
+    ) -> int:
+        """Сумма всех распределений одним агрегатным запросом.
+        Должна совпадать с суммами invested_amount проектов
+        и пожертвований."""
+        return await session.scalar(
+            select(func.coalesce(func.sum(Investment.amount), 0))
+        )
+
+
+investment_crud = CRUDInvestment(Investment)
@@ -1,26 +1,177 @@
+from typing import AsyncIterator, Iterable, List, Optional
+
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from sqlalchemy import delete, false, func, inspect, select
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, make_transient_to_detached
 
+from app.core.config import settings
+from app.core.constants import STREAM_CHUNK_SIZE
+from app.core.db import get_dialect_name, keep_loaded_on_commit
+from app.core.versioning import project_version
 from app.crud.base import CRUDBase
+from app.crud.cache import CacheBackend, LocalCache
+from app.crud.fund_summary import fund_summary_crud
 from app.models import CharityProject
 
 
+CHANGED_PROJECTS_KEY = 'changed_project_ids'
+# Значение ключа имени в кэше: проекта с таким именем нет.
+FREE_NAME = 0
+
+
 class CRUDCharityProject(CRUDBase):
-    """Класс CRUD для проектов."""
+    """Класс CRUD для проектов.
+    Поиск проекта по id и по имени идет через кэш (read-through),
+    если он задан. В кэше хранятся значения колонок, объект
+    присоединяется к сессии без запроса к БД; для свободного имени
+    хранится FREE_NAME. Кэш может отставать
+    от БД (изменения других процессов), поэтому проверки перед
+    изменением проекта читают БД (use_cache=False)."""
+
+    def __init__(self, model, cache: Optional[CacheBackend] = None):
+        super().__init__(model)
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._generation = 0
+
+    def _id_key(self, obj_id: int) -> str:
+        return f'{self.model.__tablename__}:id:{obj_id}'
+
+    def _name_key(self, name: str) -> str:
+        return f'{self.model.__tablename__}:name:{name}'
+
+    async def _from_cache(
+            self,
+            obj_id: Optional[int],
+            session: AsyncSession,
+    ) -> Optional[CharityProject]:
+        """Проект из кэша, присоединенный к сессии, или None."""
+        data = None if obj_id is None else await self.cache.get(
+            self._id_key(obj_id)
+        )
+        if data is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        db_obj = self.model(**data)
+        make_transient_to_detached(db_obj)
+        return await session.merge(db_obj, load=False)
+
+    async def _remember(
+            self,
+            db_obj: Optional[CharityProject],
+            generation: int,
+    ) -> None:
+        """Сохранение значений колонок проекта в кэше. По имени
+        хранится только id, поэтому достаточно удалять запись по id.
+        Если после чтения из БД (generation) кэш очищался, значение
+        могло устареть и не сохраняется."""
+        if (self.cache is None or db_obj is None or
+                generation != self._generation):
+            return
+        data = {
+            attr.key: getattr(db_obj, attr.key)
+            for attr in inspect(db_obj).mapper.column_attrs
+        }
+        await self.cache.set(self._id_key(db_obj.id), data)
+        await self.cache.set(self._name_key(db_obj.name), db_obj.id)
+
+    async def _remember_free_name(
+            self,
+            name: str,
+            generation: int,
+    ) -> None:
+        """Сохранение в кэше того, что имя свободно."""
+        if self.cache is None or generation != self._generation:
+            return
+        await self.cache.set(self._name_key(name), FREE_NAME)
+
+    async def invalidate(
+            self,
+            obj_ids: Iterable[int],
+            names: Iterable[str] = (),
+    ) -> None:
+        """Удаление из кэша проектов и записей об именах.
+        Имена удаляются при создании и переименовании проектов,
+        чтобы не осталась запись о том, что имя свободно."""
+        self._generation += 1
+        if self.cache is not None:
+            await self.cache.delete(
+                *(self._id_key(obj_id) for obj_id in obj_ids),
+                *(self._name_key(name) for name in names),
+            )
+
+    def mark_changed(
+            self,
+            session: AsyncSession,
+            obj_ids: Iterable[int],
+    ) -> None:
+        """Отметить проекты, измененные в транзакции сессии,
+        для invalidate_changed после commit."""
+        session.sync_session.info.setdefault(
+            CHANGED_PROJECTS_KEY, set()
+        ).update(obj_ids)
+
+    async def invalidate_changed(self, session: AsyncSession) -> None:
+        """Удаление из кэша проектов, отмеченных mark_changed."""
+        await self.invalidate(
+            session.sync_session.info.pop(CHANGED_PROJECTS_KEY, ())
+        )
+
+    async def _after_create(
+            self,
+            db_obj: CharityProject,
+            session: AsyncSession,
+    ) -> None:
+        """Учет нового проекта в сводке фонда."""
+        project_version.touch(session)
+        await fund_summary_crud.apply(
+            session, projects_amount=db_obj.full_amount, open_projects=1
+        )
 
     async def get(
             self,
             obj_id: int,
-            session: AsyncSession
+            session: AsyncSession,
+            use_cache: bool = True,
     ):
         """Функция отображения объекта"""
+        if self.cache is not None and use_cache:
+            db_obj = await self._from_cache(obj_id, session)
+            if db_obj is not None:
+                return db_obj
+        generation = self._generation
         db_obj = await session.execute(
             select(self.model).where(
                 self.model.id == obj_id
             )
         )
-        return db_obj.scalars().first()
+        db_obj = db_obj.scalars().first()
+        await self._remember(db_obj, generation)
+        return db_obj
+
+    async def get_with_name_taken(
+            self,
+            obj_id: int,
+            name: Optional[str],
+            session: AsyncSession
+    ):
+        """Функция получения объекта и признака того, что имя name
+        уже занято каким-либо проектом, одним запросом."""
+        other = aliased(self.model)
+        name_taken = (
+            select(other.id).where(other.name == name).exists()
+            if name is not None else false()
+        )
+        db_obj = await session.execute(
+            select(self.model, name_taken).where(
+                self.model.id == obj_id
+            )
+        )
+        return db_obj.first()
 
     async def update(
             self,
@@ -31,13 +182,22 @@ class CRUDCharityProject(CRUDBase):
         """Функция изменения объекта."""
         obj_data = jsonable_encoder(db_obj)
         update_data = obj_in.dict(exclude_unset=True)
+        old_full_amount = db_obj.full_amount
+        old_name = db_obj.name
 
         for field in obj_data:
             if field in update_data:
                 setattr(db_obj, field, update_data[field])
         session.add(db_obj)
-        await session.commit()
-        await session.refresh(db_obj)
+        project_version.touch(session)
+        await fund_summary_crud.apply(
+            session, projects_amount=db_obj.full_amount - old_full_amount
+        )
+        with keep_loaded_on_commit(session):
+            await session.commit()
+        await self.invalidate([db_obj.id], {old_name, db_obj.name})
+        if inspect(db_obj).expired:
+            await session.refresh(db_obj)
         return db_obj
 
     async def remove(
@@ -45,9 +205,26 @@ class CRUDCharityProject(CRUDBase):
             db_obj,
             session: AsyncSession,
     ):
-        """Функция удаления проекта."""
-        await session.delete(db_obj)
+        """Функция удаления проекта. Проект удаляется, только если
+        в него не вложены средства (условие проверяется в самом
+        DELETE), иначе возвращается None."""
+        result = await session.execute(
+            delete(self.model).where(
+                self.model.id == db_obj.id,
+                self.model.invested_amount == 0,
+            )
+        )
+        if not result.rowcount:
+            await session.rollback()
+            return None
+        project_version.touch(session)
+        await fund_summary_crud.apply(
+            session,
+            projects_amount=-db_obj.full_amount,
+            open_projects=-(not db_obj.fully_invested),
+        )
         await session.commit()
+        await self.invalidate([db_obj.id], [db_obj.name])
         return db_obj
 
     async def found_charity_project_by_name(
@@ -55,28 +232,144 @@ class CRUDCharityProject(CRUDBase):
             charity_project_name: str,
             session: AsyncSession
     ):
-        """Функция поиска проекта по имени."""
+        """Функция поиска проекта по имени. Отсутствие проекта
+        тоже кэшируется: проверка имени при создании проекта
+        обычно не находит проект."""
+        if self.cache is not None:
+            obj_id = await self.cache.get(
+                self._name_key(charity_project_name)
+            )
+            if obj_id == FREE_NAME:
+                self.cache_hits += 1
+                return None
+            db_obj = await self._from_cache(obj_id, session)
+            if db_obj is not None and db_obj.name == charity_project_name:
+                return db_obj
+        generation = self._generation
         db_obj = await session.execute(
             select(CharityProject).where(
                 CharityProject.name == charity_project_name
             )
         )
-        return db_obj.scalars().first()
+        db_obj = db_obj.scalars().first()
+        if db_obj is None:
+            await self._remember_free_name(charity_project_name, generation)
+        await self._remember(db_obj, generation)
+        return db_obj
 
-    async def get_projects_by_completion_rate(
+    async def get_taken_names(
+            self,
+            names: List[str],
+            session: AsyncSession
+    ) -> List[str]:
+        """Функция поиска уже занятых имен из списка одним запросом."""
+        taken = await session.execute(
+            select(CharityProject.name).where(
+                CharityProject.name.in_(names)
+            )
+        )
+        return taken.scalars().all()
+
+    async def get_multi_by_names(
             self,
+            names: List[str],
             session: AsyncSession
+    ) -> List[CharityProject]:
+        """Функция получения проектов по списку имен в порядке создания."""
+        projects = await session.execute(
+            select(CharityProject).where(
+                CharityProject.name.in_(names)
+            ).order_by(CharityProject.id)
+        )
+        return projects.scalars().all()
+
+    def _duration(self, session: AsyncSession):
+        """Выражение времени сбора средств проекта.
+        В SQLite даты хранятся строками, поэтому разница
+        считается через julianday (в днях), в PostgreSQL
+        вычитание дат дает interval."""
+        if get_dialect_name(session) == 'sqlite':
+            return (
+                func.julianday(CharityProject.close_date) -
+                func.julianday(CharityProject.create_date)
+            )
+        return CharityProject.close_date - CharityProject.create_date
+
+    def _completion_rate_query(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            *columns,
+    ):
+        query = select(*(columns or (
+            CharityProject.name,
+            CharityProject.description,
+            CharityProject.create_date,
+            CharityProject.close_date,
+        ))).where(
+            CharityProject.fully_invested.is_(True)
+        ).order_by(self._duration(session), CharityProject.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    async def get_projects_by_completion_rate(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
     ):
         """Функция получения списка закрытых объектов,
-        отсортированных по времени в работе."""
+        отсортированных по времени в работе.
+        Сортировка и ограничение выполняются в БД,
+        загружаются только поля, нужные для отчета."""
         projects = await session.execute(
-            select(CharityProject).where(
-                CharityProject.fully_invested == 1
-            ))
-        return sorted(
-            projects.scalars().all(),
-            key=lambda obj: obj.close_date - obj.create_date
+            self._completion_rate_query(session, limit)
+        )
+        return projects.all()
+
+    async def get_closed_projects_by_completion_rate(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+    ) -> List[CharityProject]:
+        """Те же проекты в том же порядке, но объектами со всеми
+        полями (для API, а не для отчета)."""
+        projects = await session.execute(
+            self._completion_rate_query(session, limit, CharityProject)
+        )
+        return projects.scalars().all()
+
+    async def stream_projects_by_completion_rate(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+            chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[List[Row]]:
+        """Те же проекты порциями по chunk_size строк через
+        серверный курсор, без полного списка в памяти."""
+        result = await session.stream(
+            self._completion_rate_query(session, limit)
+        )
+        async for partition in result.partitions(chunk_size):
+            yield partition
+
+    async def count_projects_by_completion_rate(
+            self,
+            session: AsyncSession,
+            limit: Optional[int] = None,
+    ) -> int:
+        """Количество проектов в отчете."""
+        count = await session.scalar(
+            select(func.count()).select_from(CharityProject).where(
+                CharityProject.fully_invested.is_(True)
+            )
         )
+        return count if limit is None else min(count, limit)
 
 
-charity_project_crud = CRUDCharityProject(CharityProject)
+charity_project_crud = CRUDCharityProject(
+    CharityProject,
+    cache=LocalCache(
+        settings.project_cache_size, settings.project_cache_ttl
+    ) if settings.project_cache_size else None,
+)
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.constants import (REPORT_LEASE_EXPIRED_ERROR,
+                                REPORT_STATUS_FAILED, REPORT_STATUS_PENDING,
+                                REPORT_STATUS_RUNNING)
+from app.crud.base import CRUDBase
+from app.models import ReportJob
+
+
+def lease_time() -> timedelta:
+    """Срок аренды задачи обработчиком."""
+    return timedelta(seconds=settings.report_lease_seconds)
+
+
+class CRUDReportJob(CRUDBase):
+    """Класс CRUD для задач формирования отчетов."""
+
+    async def get(
+            self,
+            obj_id: int,
+            session: AsyncSession,
+    ) -> Optional[ReportJob]:
+        """Функция получения задачи по id."""
+        return await session.get(ReportJob, obj_id)
+
+    async def requeue_expired(self, session: AsyncSession) -> int:
+        """Вернуть в очередь задачи, обработчик которых перестал
+        продлевать аренду (остановлен или завис). Задачи, исчерпавшие
+        report_max_attempts, получают статус failed."""
+        now = datetime.now()
+        result = await session.execute(
+            update(ReportJob).where(
+                ReportJob.status == REPORT_STATUS_RUNNING,
+                ReportJob.lease_until < now,
+            ).values(
+                status=case(
+                    (ReportJob.attempts >= settings.report_max_attempts,
+                     REPORT_STATUS_FAILED),
+                    else_=REPORT_STATUS_PENDING,
+                ),
+                finish_date=case(
+                    (ReportJob.attempts >= settings.report_max_attempts,
+                     now),
+                    else_=None,
+                ),
+                error=REPORT_LEASE_EXPIRED_ERROR,
+            )
+        )
+        await session.commit()
+        return result.rowcount
+
+    async def claim_due(
+            self,
+            limit: int,
+            session: AsyncSession,
+    ) -> List[int]:
+        """
+        Взять в работу не более limit ожидающих задач, срок которых
+        наступил. Задача переводится в running условным UPDATE,
+        поэтому одну задачу не возьмут два обработчика. Обработчик
+        получает аренду до lease_until и должен ее продлевать.
+        """
+        now = datetime.now()
+        job_ids = (await session.execute(
+            select(ReportJob.id).where(
+                ReportJob.status == REPORT_STATUS_PENDING,
+                ReportJob.run_after <= now,
+            ).order_by(ReportJob.run_after, ReportJob.id).limit(limit)
+        )).scalars().all()
+        claimed = []
+        for job_id in job_ids:
+            result = await session.execute(
+                update(ReportJob).where(
+                    ReportJob.id == job_id,
+                    ReportJob.status == REPORT_STATUS_PENDING,
+                ).values(
+                    status=REPORT_STATUS_RUNNING,
+                    attempts=ReportJob.attempts + 1,
+                    started_at=now,
+                    lease_until=now + lease_time(),
+                )
+            )
+            if result.rowcount:
+                claimed.append(job_id)
+        await session.commit()
+        return claimed
+
+    async def extend_lease(
+            self,
+            job_id: int,
+            attempts: int,
+            session: AsyncSession,
+    ) -> bool:
+        """Продлить аренду задачи. Возвращает False, если задача
+        уже не принадлежит этой попытке."""
+        result = await session.execute(
+            update(ReportJob).where(
+                ReportJob.id == job_id,
+                ReportJob.status == REPORT_STATUS_RUNNING,
+                ReportJob.attempts == attempts,
+            ).values(lease_until=datetime.now() + lease_time())
+        )
+        await session.commit()
+        return bool(result.rowcount)
+
+    async def set_result(
+            self,
+            job_id: int,
+            attempts: int,
+            session: AsyncSession,
+            **values,
+    ) -> bool:
+        """Записать результат попытки. Результат записывается, только
+        если задача все еще выполняется этой попыткой (attempts):
+        после истечения аренды ее мог взять другой обработчик."""
+        result = await session.execute(
+            update(ReportJob).where(
+                ReportJob.id == job_id,
+                ReportJob.status == REPORT_STATUS_RUNNING,
+                ReportJob.attempts == attempts,
+            ).values(lease_until=None, **values)
+        )
+        await session.commit()
+        return bool(result.rowcount)
+
+
+report_job_crud = CRUDReportJob(ReportJob)
@@ -2,7 +2,27 @@ from fastapi import FastAPI
 
 from app.api.routers import main_router
 from app.core.config import settings
+from app.core.google_client import google_client
+from app.core.password import password_helper
+from app.services.allocation_queue import allocation_queue
+from app.services.report_jobs import report_queue
 
 app = FastAPI(title=settings.app_title)
 
 app.include_router(main_router)
+
+
+@app.on_event('startup')
+async def startup():
+    if settings.async_allocation and settings.allocation_worker:
+        allocation_queue.start()
+    if settings.report_worker:
+        report_queue.start()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    await allocation_queue.stop()
+    await report_queue.stop()
+    password_helper.shutdown()
+    await google_client.close()
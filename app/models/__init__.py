@@ -1,3 +1,8 @@
+from .allocation_task import AllocationTask  # noqa
 from .charity_project import CharityProject  # noqa
 from .donation import Donation  # noqa
+from .fund_summary import FundSummary  # noqa
+from .investment import Investment  # noqa
+from .report_job import ReportJob  # noqa
+from .table_version import TableVersion  # noqa
 from .user import User  # noqa
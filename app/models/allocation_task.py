@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy.sql import func
+
+from app.core.db import Base
+
+
+class AllocationTask(Base):
+    """Модель очереди нераспределенных пожертвований (outbox).
+    После ошибки распределения задача откладывается до run_after,
+    attempts — количество неудачных попыток."""
+    donation_id = Column(
+        Integer,
+        ForeignKey('donation.id', name='fk_allocationtask_donation_id_donation'),
+        unique=True,
+        nullable=False,
+    )
+    create_date = Column(DateTime, server_default=func.now())
+    attempts = Column(Integer, default=0, nullable=False)
+    run_after = Column(DateTime)
+    error = Column(Text)
@@ -1,6 +1,8 @@
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Integer
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer
+from sqlalchemy.orm import declared_attr
+from sqlalchemy.sql import column
 
 from app.core.constants import DEFAULT_INVESTED_AMOUNT
 from app.core.db import Base
@@ -15,3 +17,18 @@ class BaseProjectDonationModel(Base):
     fully_invested = Column(Boolean, default=False)
     create_date = Column(DateTime, default=datetime.now)
     close_date = Column(DateTime)
+
+    @declared_attr
+    def __table_args__(cls):
+        """Индекс очереди открытых объектов (FIFO).
+        В SQLite и PostgreSQL индекс частичный: в него попадают
+        только открытые объекты."""
+        open_queue = column('fully_invested').is_(False)
+        return (
+            Index(
+                f'ix_{cls.__tablename__}_open_queue',
+                'fully_invested', 'create_date', 'id',
+                sqlite_where=open_queue,
+                postgresql_where=open_queue,
+            ),
+        )
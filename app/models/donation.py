@@ -6,5 +6,5 @@ from app.models.base import BaseProjectDonationModel
 class Donation(BaseProjectDonationModel):
     """Модель пожертвований, наследуется от базовой."""
     user_id = Column(Integer, ForeignKey(
-        'user.id', name='fk_donation_user_id_user'))
+        'user.id', name='fk_donation_user_id_user'), index=True)
     comment = Column(Text)
\ No newline at end of file
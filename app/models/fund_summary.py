@@ -0,0 +1,13 @@
+from sqlalchemy import BigInteger, Column, Integer
+
+from app.core.db import Base
+
+
+class FundSummary(Base):
+    """Модель сводных показателей фонда.
+    Содержит одну строку, которая обновляется инкрементально
+    при создании, изменении, удалении и распределении средств."""
+    donated_amount = Column(BigInteger, nullable=False, default=0)
+    invested_amount = Column(BigInteger, nullable=False, default=0)
+    projects_amount = Column(BigInteger, nullable=False, default=0)
+    open_projects = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+
+from app.core.db import Base
+
+
+class Investment(Base):
+    """Модель журнала распределений: какое пожертвование
+    и в каком размере профинансировало проект. Записи только
+    добавляются."""
+    donation_id = Column(
+        Integer,
+        ForeignKey('donation.id', name='fk_investment_donation_id_donation'),
+        index=True,
+        nullable=False,
+    )
+    project_id = Column(
+        Integer,
+        ForeignKey(
+            'charityproject.id', name='fk_investment_project_id_charityproject'
+        ),
+        index=True,
+        nullable=False,
+    )
+    amount = Column(Integer, nullable=False)
+    create_date = Column(DateTime, nullable=False)
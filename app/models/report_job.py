@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+
+from app.core.constants import (MAX_LEN_REPORT_STATUS,
+                                REPORT_SPREADSHEET_URL, REPORT_STATUS_PENDING)
+from app.core.db import Base
+
+
+class ReportJob(Base):
+    """Модель задачи формирования отчета в Google Sheets.
+    Задача ждет в статусе pending до момента run_after,
+    после неудачной попытки возвращается в pending с задержкой.
+    Выполняющая задачу попытка продлевает lease_until; задача
+    с истекшей арендой возвращается в очередь."""
+    user_id = Column(
+        Integer, ForeignKey('user.id', name='fk_reportjob_user_id_user')
+    )
+    project_limit = Column(Integer)
+    status = Column(
+        String(MAX_LEN_REPORT_STATUS),
+        default=REPORT_STATUS_PENDING,
+        index=True,
+        nullable=False,
+    )
+    attempts = Column(Integer, default=0, nullable=False)
+    run_after = Column(DateTime, default=datetime.now, nullable=False)
+    spreadsheet_id = Column(String)
+    error = Column(Text)
+    create_date = Column(DateTime, default=datetime.now)
+    started_at = Column(DateTime)
+    lease_until = Column(DateTime)
+    finish_date = Column(DateTime)
+
+    @property
+    def spreadsheet_url(self):
+        if self.spreadsheet_id is None:
+            return None
+        return REPORT_SPREADSHEET_URL.format(self.spreadsheet_id)
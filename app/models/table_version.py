@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, String, event
+
+from app.core.constants import MAX_LEN_TABLE_NAME
+from app.core.db import Base
+
+
+class TableVersion(Base):
+    """Модель версии таблицы. Строка таблицы увеличивается
+    в транзакции, которая изменяет таблицу, поэтому версия общая
+    для всех процессов приложения и CLI-команд."""
+    name = Column(String(MAX_LEN_TABLE_NAME), unique=True, nullable=False)
+    version = Column(BigInteger, default=0, nullable=False)
+    modified = Column(DateTime, nullable=False)
+
+
+VERSIONED_TABLES = ('charityproject',)
+
+
+@event.listens_for(TableVersion.__table__, 'after_create')
+def create_versions(target, connection, **kwargs) -> None:
+    """Строки версий создаются вместе с таблицей (create_all в тестах
+    и бенчмарках), в миграции — отдельным INSERT."""
+    connection.execute(target.insert(), [
+        {'name': name, 'version': 0, 'modified': datetime.utcnow()}
+        for name in VERSIONED_TABLES
+    ])
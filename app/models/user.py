@@ -1,8 +1,10 @@
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTable
+from sqlalchemy import Column, DateTime
 
 from app.core.db import Base
 
 
 class User(SQLAlchemyBaseUserTable[int], Base):
-    """Модель пользователя."""
-    pass
+    """Модель пользователя. Токены, выпущенные раньше
+    token_valid_after, считаются отозванными."""
+    token_valid_after = Column(DateTime)
@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class TableConsistency(BaseModel):
+    """Схема результата проверки одной таблицы."""
+    table: str
+    rows: int
+    invested_amount: int
+    violations: Dict[str, int]
+    repaired: int = 0
+
+
+class ConsistencyReport(BaseModel):
+    """Схема отчета о проверке согласованности данных."""
+    tables: List[TableConsistency]
+    balanced: bool
+    ledger_invested_amount: Optional[int]
+    idle_with_open_projects: bool
+    repair_refused: bool = False
+    reallocated_amount: int = 0
+    seconds: float
+    rows_per_second: float
+
+    @property
+    def consistent(self) -> bool:
+        """Нарушений не найдено."""
+        return self.balanced and not self.idle_with_open_projects and not any(
+            table.violations for table in self.tables
+        )
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, Extra, PositiveInt
 
@@ -28,3 +28,36 @@ class DonationGetForSuperuser(DonationGetForUser):
     invested_amount: Optional[int]
     fully_invested: Optional[bool]
     close_date: Optional[datetime]
+
+
+class DonationStatus(BaseModel):
+    """Схема статуса распределения пожертвования."""
+    id: int
+    distributed: bool
+    invested_amount: Optional[int]
+    fully_invested: Optional[bool]
+
+
+class DonationImport(BaseModel):
+    """Схема строки файла импорта пожертвований."""
+    full_amount: PositiveInt
+    comment: Optional[str]
+    user_id: Optional[int]
+    create_date: Optional[datetime]
+
+
+class DonationImportError(BaseModel):
+    """Схема ошибки в строке файла импорта."""
+    line: int
+    error: str
+
+
+class DonationImportReport(BaseModel):
+    """Схема отчета об импорте пожертвований."""
+    dry_run: bool
+    rows: int
+    donated_amount: int
+    invested_amount: int
+    seconds: float
+    rows_per_second: float
+    errors: List[DonationImportError]
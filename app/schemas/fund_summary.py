@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class FundStats(BaseModel):
+    """Схема для показа сводных показателей фонда."""
+    donated_amount: int
+    invested_amount: int
+    idle_amount: int
+    projects_amount: int
+    remaining_amount: int
+    open_projects: int
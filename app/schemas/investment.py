@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class InvestmentDB(BaseModel):
+    """Схема для показа записи журнала распределений."""
+    project_id: int
+    amount: int
+    create_date: datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ReportJobCreate(BaseModel):
+    """Схема для создания задачи формирования отчета."""
+    project_limit: Optional[int]
+
+
+class ReportJobDB(BaseModel):
+    """Схема для показа задачи формирования отчета."""
+    id: int
+    status: str
+    attempts: int
+    project_limit: Optional[int]
+    spreadsheet_url: Optional[str]
+    error: Optional[str]
+    create_date: datetime
+    finish_date: Optional[datetime]
+
+    class Config:
+        orm_mode = True
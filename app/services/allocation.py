@@ -0,0 +1,98 @@
+"""Планировщик распределения средств (FIFO).
+
+Чистые функции без обращения к БД: на вход подаются свободные суммы
+открытых проектов и пожертвований в порядке очереди, на выходе —
+сколько вложить в каждый объект и сколько объектов с начала очереди
+закрывается, а также пары «проект — пожертвование» для журнала
+распределений. Работают за O(n + m) на префиксных суммах.
+"""
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import List, NamedTuple, Sequence
+
+
+class QueuePlan(NamedTuple):
+    """План для одной очереди."""
+    # Суммы, вложенные в объекты с начала очереди. Объекты
+    # за пределами списка не затрагиваются.
+    amounts: List[int]
+    # Количество объектов с начала очереди, которые закрываются.
+    closed: int
+
+
+class Transfer(NamedTuple):
+    """Перевод из пожертвования в проект (индексы в очередях)."""
+    project: int
+    donation: int
+    amount: int
+
+
+class AllocationPlan(NamedTuple):
+    """План распределения между очередями проектов и пожертвований."""
+    total: int
+    projects: QueuePlan
+    donations: QueuePlan
+    transfers: List[Transfer]
+
+
+def plan_queue(sizes: Sequence[int], total: int) -> QueuePlan:
+    """
+    Распределение суммы total по очереди объектов со свободными
+    суммами sizes: объект i получает min(S_i, total) - min(S_i-1, total),
+    где S_i — префиксная сумма очереди. Закрываются объекты,
+    у которых S_i <= total.
+    """
+    prefix = list(accumulate(sizes))
+    closed = bisect_right(prefix, total)
+    touched = max(closed, min(len(prefix), bisect_left(prefix, total) + 1))
+    amounts = []
+    previous = 0
+    for cumulative in prefix[:touched]:
+        current = min(cumulative, total)
+        amounts.append(current - previous)
+        previous = current
+    return QueuePlan(amounts, closed)
+
+
+def plan_transfers(
+        project_needs: Sequence[int],
+        donation_amounts: Sequence[int],
+        total: int,
+) -> List[Transfer]:
+    """
+    Слияние префиксных сумм двух очередей: каждая граница
+    проекта или пожертвования внутри [0, total] завершает
+    очередной перевод.
+    """
+    project_prefix = list(accumulate(project_needs))
+    donation_prefix = list(accumulate(donation_amounts))
+    transfers = []
+    position = project = donation = 0
+    while position < total:
+        end = min(project_prefix[project], donation_prefix[donation])
+        if end > position:
+            transfers.append(Transfer(project, donation, end - position))
+            position = end
+        if project_prefix[project] == end:
+            project += 1
+        if donation_prefix[donation] == end:
+            donation += 1
+    return transfers
+
+
+def plan_allocation(
+        project_needs: Sequence[int],
+        donation_amounts: Sequence[int],
+) -> AllocationPlan:
+    """
+    Распределение открытых пожертвований по открытым проектам.
+    Распределяется меньшая из двух сумм очередей, каждая очередь
+    заполняется с начала.
+    """
+    total = min(sum(project_needs), sum(donation_amounts))
+    return AllocationPlan(
+        total,
+        plan_queue(project_needs, total),
+        plan_queue(donation_amounts, total),
+        plan_transfers(project_needs, donation_amounts, total),
+    )
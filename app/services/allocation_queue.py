@@ -0,0 +1,149 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.models import AllocationTask
+from app.services.investment import investment_service
+
+logger = logging.getLogger(__name__)
+
+
+class AllocationQueue:
+    """
+    Фоновый обработчик отложенного распределения пожертвований.
+    Задачи хранятся в таблице allocationtask, поэтому после
+    перезапуска приложения необработанные пожертвования
+    будут распределены. Задача, распределение которой завершилось
+    ошибкой, откладывается с экспоненциальной задержкой и не мешает
+    остальным. После allocation_max_attempts неудачных попыток
+    задача удаляется, а пожертвование возвращается в открытую
+    очередь: его распределит следующий новый проект или
+    пожертвование (или check_consistency --repair).
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        """Запуск обработчика в текущем event loop."""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановка обработчика."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def notify(self) -> None:
+        """Сообщить обработчику о новых задачах."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _postpone(
+            self,
+            session: AsyncSession,
+            donation_id: int,
+            error: Exception,
+    ) -> None:
+        """Отложить задачу после неудачной попытки
+        или удалить ее после последней."""
+        attempts = await session.scalar(
+            select(AllocationTask.attempts).where(
+                AllocationTask.donation_id == donation_id
+            )
+        )
+        if attempts is None:
+            return
+        attempts += 1
+        if attempts >= settings.allocation_max_attempts:
+            logger.error(
+                'Пожертвование %s не распределено за %s попыток '
+                'и возвращено в открытую очередь: %r.',
+                donation_id, attempts, error,
+            )
+            await session.execute(
+                delete(AllocationTask).where(
+                    AllocationTask.donation_id == donation_id
+                )
+            )
+            await session.commit()
+            return
+        await session.execute(
+            update(AllocationTask).where(
+                AllocationTask.donation_id == donation_id
+            ).values(
+                attempts=attempts,
+                run_after=datetime.now() + timedelta(
+                    seconds=settings.allocation_retry_delay *
+                    2 ** (attempts - 1)
+                ),
+                error=repr(error),
+            )
+        )
+        await session.commit()
+
+    async def drain_batch(self) -> int:
+        """Распределить одну пачку пожертвований из очереди.
+        Каждое пожертвование распределяется в отдельной сессии."""
+        async with self._session_factory() as session:
+            donation_ids = (await session.execute(
+                select(AllocationTask.donation_id).where(
+                    AllocationTask.attempts <
+                    settings.allocation_max_attempts,
+                    or_(
+                        AllocationTask.run_after.is_(None),
+                        AllocationTask.run_after <= datetime.now(),
+                    ),
+                ).order_by(AllocationTask.id).limit(
+                    settings.allocation_batch_size
+                )
+            )).scalars().all()
+        for donation_id in donation_ids:
+            async with self._session_factory() as session:
+                try:
+                    await investment_service.distribute_donation(
+                        session, donation_id
+                    )
+                except Exception as error:
+                    logger.exception(
+                        'Ошибка распределения пожертвования %s.', donation_id
+                    )
+                    await session.rollback()
+                    await self._postpone(session, donation_id, error)
+        return len(donation_ids)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.drain_batch()
+            except Exception:
+                logger.exception('Ошибка распределения пожертвований.')
+                processed = 0
+            if processed >= settings.allocation_batch_size:
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), settings.allocation_poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+allocation_queue = AllocationQueue()
@@ -0,0 +1,279 @@
+import time
+from datetime import datetime
+from typing import AsyncIterator, Callable, List, Optional, Tuple, Union
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import CONSISTENCY_BATCH_SIZE
+from app.core.db import AsyncSessionLocal
+from app.core.versioning import project_version
+from app.crud.fund_summary import fund_summary_crud
+from app.crud.investments import investment_crud
+from app.crud.projects import charity_project_crud
+from app.models import CharityProject, Donation, Investment
+from app.schemas.consistency import ConsistencyReport, TableConsistency
+from app.services.investment import investment_service
+
+INVESTED_OUT_OF_RANGE = 'invested_out_of_range'
+STALE_FULLY_INVESTED = 'stale_fully_invested'
+STALE_CLOSE_DATE = 'stale_close_date'
+LEDGER_MISMATCH = 'ledger_mismatch'
+
+Progress = Callable[[str, int, float], None]
+
+
+def check_row(
+        row: Row,
+        close_date: datetime,
+        use_ledger: bool = False,
+) -> Tuple[List[str], dict]:
+    """
+    Проверка инвариантов строки проекта или пожертвования:
+    0 <= invested_amount <= full_amount, fully_invested и close_date
+    соответствуют вложенной сумме, а при use_ledger вложенная сумма
+    совпадает с журналом распределений. Возвращает нарушения
+    и исправленные значения для UPDATE.
+    """
+    violations = []
+    invested_amount = row.invested_amount
+    if use_ledger and invested_amount != row.ledger_amount:
+        violations.append(LEDGER_MISMATCH)
+        invested_amount = row.ledger_amount
+    if invested_amount is None or not (
+        0 <= invested_amount <= row.full_amount
+    ):
+        violations.append(INVESTED_OUT_OF_RANGE)
+        invested_amount = min(max(invested_amount or 0, 0), row.full_amount)
+    fully_invested = invested_amount == row.full_amount
+    if row.fully_invested != fully_invested:
+        violations.append(STALE_FULLY_INVESTED)
+    if (row.close_date is not None) != fully_invested:
+        violations.append(STALE_CLOSE_DATE)
+    return violations, {
+        '_id': row.id,
+        '_old_invested_amount': row.invested_amount,
+        '_invested_amount': invested_amount,
+        '_fully_invested': fully_invested,
+        '_close_date': (row.close_date or close_date)
+        if fully_invested else None,
+    }
+
+
+def is_balanced(
+        invested_amounts: List[int],
+        ledger_invested_amount: Optional[int] = None,
+) -> bool:
+    """Суммы вложенных средств таблиц (и журнала) совпадают."""
+    if ledger_invested_amount is not None:
+        invested_amounts = [*invested_amounts, ledger_invested_amount]
+    return len(set(invested_amounts)) == 1
+
+
+class ConsistencyChecker:
+    """
+    Проверка и исправление согласованности проектов и пожертвований.
+    Таблицы читаются порциями по CONSISTENCY_BATCH_SIZE строк
+    (keyset по id), поэтому память не зависит от размера таблиц.
+    Исправления каждой порции записываются отдельной транзакцией;
+    строка обновляется, только если ее invested_amount
+    не изменился после чтения.
+    """
+
+    def __init__(
+            self,
+            session_factory=AsyncSessionLocal,
+            repair: bool = False,
+            use_ledger: bool = False,
+            progress: Optional[Progress] = None,
+    ):
+        self._session_factory = session_factory
+        self._repair = repair
+        self._use_ledger = use_ledger
+        self._progress = progress
+
+    def _scan_query(self, model: Union[CharityProject, Donation]):
+        table = model.__table__
+        columns = [
+            table.c.id, table.c.full_amount, table.c.invested_amount,
+            table.c.fully_invested, table.c.close_date,
+        ]
+        if self._use_ledger:
+            ledger = Investment.__table__
+            key = (
+                ledger.c.project_id if model is CharityProject
+                else ledger.c.donation_id
+            )
+            columns.append(
+                select(func.coalesce(func.sum(ledger.c.amount), 0)).where(
+                    key == table.c.id
+                ).scalar_subquery().label('ledger_amount')
+            )
+        return select(*columns).order_by(table.c.id).limit(
+            CONSISTENCY_BATCH_SIZE
+        )
+
+    async def _chunks(
+            self,
+            model: Union[CharityProject, Donation],
+            session: AsyncSession,
+    ) -> AsyncIterator[List[Row]]:
+        """Порции строк таблицы в порядке id."""
+        query = self._scan_query(model)
+        chunk_query = query
+        while True:
+            rows = (await session.execute(chunk_query)).all()
+            if rows:
+                yield rows
+            if len(rows) < CONSISTENCY_BATCH_SIZE:
+                return
+            chunk_query = query.where(model.__table__.c.id > rows[-1].id)
+
+    async def _write_fixes(
+            self,
+            model: Union[CharityProject, Donation],
+            fixes: List[dict],
+            session: AsyncSession,
+    ) -> int:
+        """Запись исправлений одной порции одним UPDATE (executemany)."""
+        table = model.__table__
+        if model is CharityProject:
+            project_version.touch(session)
+            charity_project_crud.mark_changed(
+                session, (fix['_id'] for fix in fixes)
+            )
+        result = await session.execute(
+            update(table).where(
+                table.c.id == bindparam('_id'),
+                table.c.invested_amount.is_not_distinct_from(
+                    bindparam('_old_invested_amount')
+                ),
+            ).values(
+                invested_amount=bindparam('_invested_amount'),
+                fully_invested=bindparam('_fully_invested'),
+                close_date=bindparam('_close_date'),
+            ),
+            fixes
+        )
+        await session.commit()
+        await charity_project_crud.invalidate_changed(session)
+        return result.rowcount if result.rowcount >= 0 else len(fixes)
+
+    async def _check_table(
+            self,
+            model: Union[CharityProject, Donation],
+            session: AsyncSession,
+            repair: bool = False,
+    ) -> Tuple[TableConsistency, int, int]:
+        """Проверка одной таблицы, при repair — с записью исправлений.
+        Возвращает результат, количество открытых строк и сумму
+        вложенных средств после исправлений."""
+        report = TableConsistency(
+            table=model.__tablename__, rows=0, invested_amount=0,
+            violations={},
+        )
+        open_rows = 0
+        fixed_invested_amount = 0
+        close_date = datetime.now()
+        started = time.perf_counter()
+        async for rows in self._chunks(model, session):
+            fixes = []
+            for row in rows:
+                violations, fix = check_row(row, close_date, self._use_ledger)
+                report.invested_amount += row.invested_amount or 0
+                fixed_invested_amount += fix['_invested_amount']
+                open_rows += not fix['_fully_invested']
+                for violation in violations:
+                    report.violations[violation] = (
+                        report.violations.get(violation, 0) + 1
+                    )
+                if violations:
+                    fixes.append(fix)
+            report.rows += len(rows)
+            if fixes and repair:
+                report.repaired += await self._write_fixes(
+                    model, fixes, session
+                )
+            if self._progress is not None:
+                elapsed = time.perf_counter() - started
+                self._progress(
+                    report.table, report.rows,
+                    report.rows / elapsed if elapsed else 0
+                )
+        return report, open_rows, fixed_invested_amount
+
+    async def _check_tables(
+            self,
+            session: AsyncSession,
+            repair: bool = False,
+    ) -> Tuple[List[TableConsistency], bool, List[int]]:
+        """Проверка обеих таблиц. Возвращает результаты, признак
+        свободных пожертвований при открытых проектах и суммы
+        вложенных средств таблиц после исправлений."""
+        projects, open_projects, projects_fixed = await self._check_table(
+            CharityProject, session, repair
+        )
+        donations, open_donations, donations_fixed = (
+            await self._check_table(Donation, session, repair)
+        )
+        return (
+            [projects, donations],
+            bool(open_projects and open_donations),
+            [projects_fixed, donations_fixed],
+        )
+
+    async def run(self) -> ConsistencyReport:
+        """
+        Проверить обе таблицы и, если задано, исправить нарушения:
+        записать исправленные строки, распределить свободные
+        пожертвования и пересчитать сводку фонда. Исправления
+        выполняются, только если после них суммы вложенных средств
+        проектов, пожертвований (и журнала) совпадут; иначе ремонт
+        отклоняется (repair_refused) и данные не меняются. После
+        ремонта отчет строится заново по исправленным данным.
+        """
+        started = time.perf_counter()
+        async with self._session_factory() as session:
+            ledger_invested_amount = None
+            if self._use_ledger:
+                ledger_invested_amount = (
+                    await investment_crud.get_invested_amount(session)
+                )
+            tables, idle_with_open_projects, fixed_amounts = (
+                await self._check_tables(session)
+            )
+            repair_refused = False
+            reallocated_amount = 0
+            if self._repair:
+                repair_refused = not is_balanced(
+                    fixed_amounts, ledger_invested_amount
+                )
+            if self._repair and not repair_refused:
+                repaired_tables, _, _ = await self._check_tables(
+                    session, repair=True
+                )
+                reallocated_amount = await investment_service.reallocate(
+                    session
+                )
+                await fund_summary_crud.rebuild(session)
+                tables, idle_with_open_projects, _ = (
+                    await self._check_tables(session)
+                )
+                for table, repaired_table in zip(tables, repaired_tables):
+                    table.repaired = repaired_table.repaired
+        seconds = time.perf_counter() - started
+        rows = sum(table.rows for table in tables)
+        return ConsistencyReport(
+            tables=tables,
+            balanced=is_balanced(
+                [table.invested_amount for table in tables],
+                ledger_invested_amount,
+            ),
+            ledger_invested_amount=ledger_invested_amount,
+            idle_with_open_projects=idle_with_open_projects,
+            repair_refused=repair_refused,
+            reallocated_amount=reallocated_amount,
+            seconds=seconds,
+            rows_per_second=rows / seconds if seconds else 0,
+        )
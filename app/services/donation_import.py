@@ -0,0 +1,156 @@
+import codecs
+import csv
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import (IO, AsyncIterator, Iterable, Iterator, List, Optional,
+                    Set, Tuple)
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool
+
+from app.core.constants import (IMPORT_CHUNK_SIZE, IMPORT_EXTRA_FIELDS_ERROR,
+                                IMPORT_FILE_ERROR, IMPORT_MAX_ERRORS,
+                                USER_NO_FOUND_ERROR)
+from app.models import User
+from app.schemas.donation import (DonationImport, DonationImportError,
+                                  DonationImportReport)
+from app.services.investment import investment_service
+
+
+ParsedRow = Tuple[int, Optional[DonationImport], Optional[str]]
+
+
+def read_donations(csv_file: IO[bytes]) -> Iterator[ParsedRow]:
+    """Построчный разбор CSV (UTF-8) с колонками full_amount, comment,
+    user_id, create_date. Выдает номер строки, пожертвование
+    или текст ошибки. Файл не в UTF-8 или с неверной структурой
+    CSV дает ошибку в строке, где разбор остановился."""
+    reader = csv.DictReader(codecs.iterdecode(csv_file, 'utf-8-sig'))
+    try:
+        for row in reader:
+            # Лишние поля DictReader кладет под ключ None (restkey).
+            if None in row:
+                yield reader.line_num, None, IMPORT_EXTRA_FIELDS_ERROR
+                continue
+            values = {key: value for key, value in row.items() if value}
+            try:
+                yield reader.line_num, DonationImport(**values), None
+            except ValidationError as error:
+                yield reader.line_num, None, str(error)
+    except (UnicodeDecodeError, csv.Error) as error:
+        yield reader.line_num + 1, None, IMPORT_FILE_ERROR.format(error)
+
+
+def chunked(rows: Iterator[ParsedRow]) -> Iterator[List[ParsedRow]]:
+    """Разбивка строк на порции по IMPORT_CHUNK_SIZE."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == IMPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_chunks(csv_file: IO[bytes]) -> AsyncIterator[List[ParsedRow]]:
+    """Разбор CSV порциями в пуле потоков: разбор и валидация
+    строк не блокируют event loop."""
+    return iterate_in_threadpool(chunked(read_donations(csv_file)))
+
+
+async def donation_chunks(
+        csv_file: IO[bytes],
+        default_user_id: Optional[int],
+) -> AsyncIterator[List[dict]]:
+    """Строки для вставки порциями по IMPORT_CHUNK_SIZE.
+    У всех строк одинаковый набор ключей (требование executemany)."""
+    now = datetime.now()
+    async for chunk in read_chunks(csv_file):
+        yield [
+            {
+                'full_amount': donation.full_amount,
+                'comment': donation.comment,
+                'user_id': donation.user_id or default_user_id,
+                'create_date': donation.create_date or now,
+                'invested_amount': 0,
+                'fully_invested': False,
+            }
+            for _, donation, _ in chunk
+        ]
+
+
+async def find_missing_users(
+        session: AsyncSession,
+        user_ids: Iterable[int],
+) -> Set[int]:
+    """Id из user_ids, которых нет в таблице пользователей."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return user_ids
+    found = (await session.execute(
+        select(User.id).where(User.id.in_(user_ids))
+    )).scalars().all()
+    return user_ids - set(found)
+
+
+async def import_donations(
+        session: AsyncSession,
+        csv_file: IO[bytes],
+        default_user_id: Optional[int],
+        dry_run: bool = False,
+) -> DonationImportReport:
+    """
+    Импорт пожертвований из CSV. Файл читается дважды: первый проход
+    проверяет все строки и существование пользователей (порциями),
+    второй (если ошибок нет и это не dry_run) вставляет их
+    и распределяет средства одной транзакцией.
+    """
+    started = time.perf_counter()
+    rows = 0
+    donated_amount = 0
+    errors = []
+    async for chunk in read_chunks(csv_file):
+        chunk_errors = []
+        user_lines = defaultdict(list)
+        for line, donation, error in chunk:
+            if error is not None:
+                chunk_errors.append(
+                    DonationImportError(line=line, error=error)
+                )
+                continue
+            rows += 1
+            donated_amount += donation.full_amount
+            user_id = donation.user_id or default_user_id
+            if user_id is not None:
+                user_lines[user_id].append(line)
+        for user_id in await find_missing_users(session, user_lines):
+            chunk_errors.extend(
+                DonationImportError(
+                    line=line, error=USER_NO_FOUND_ERROR.format(user_id)
+                )
+                for line in user_lines[user_id]
+            )
+        chunk_errors.sort(key=lambda import_error: import_error.line)
+        errors.extend(chunk_errors[:IMPORT_MAX_ERRORS - len(errors)])
+    invested_amount = 0
+    if not errors and not dry_run:
+        csv_file.seek(0)
+        rows, donated_amount, invested_amount = (
+            await investment_service.import_donations(
+                session, donation_chunks(csv_file, default_user_id)
+            )
+        )
+    seconds = time.perf_counter() - started
+    return DonationImportReport(
+        dry_run=dry_run,
+        rows=rows,
+        donated_amount=donated_amount,
+        invested_amount=invested_amount,
+        seconds=seconds,
+        rows_per_second=rows / seconds if seconds else 0,
+        errors=errors,
+    )
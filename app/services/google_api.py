@@ -1,15 +1,41 @@
 from datetime import datetime
+from typing import AsyncIterable, List
 
 from aiogoogle import Aiogoogle
 
 from app.core.config import settings
 
 FORMAT = "%Y/%m/%d %H:%M:%S"
+COLUMN_COUNT = 3
+HEADER_ROW_COUNT = 3
 
 
-async def spreadsheets_create(wrapper_services: Aiogoogle) -> str:
-    """Создание документа"""
+def report_header(now_date_time: str) -> List[list]:
+    """Строки заголовка отчета."""
+    return [
+        ['Отчёт от', now_date_time],
+        ['Топ проектов по скорости закрытия'],
+        ['Название проекта', 'Время', 'Описание']
+    ]
+
+
+def report_row(project) -> list:
+    """Строка отчета для проекта."""
+    return [
+        str(project.name),
+        str(project.close_date - project.create_date),
+        str(project.description)
+    ]
+
+
+async def spreadsheets_create(
+        wrapper_services: Aiogoogle,
+        row_count: int = 0,
+) -> str:
+    """Создание документа. Размер листа — заголовок
+    и row_count строк проектов."""
     now_date_time = datetime.now().strftime(FORMAT)
+    grid_rows = HEADER_ROW_COUNT + row_count
     service = await wrapper_services.discover('sheets', 'v4')
     spreadsheet_body = {
         'properties': {'title': f'Отчёт по закрытым проектам на {now_date_time}',
@@ -17,8 +43,9 @@ async def spreadsheets_create(wrapper_services: Aiogoogle) -> str:
         'sheets': [{'properties': {'sheetType': 'GRID',
                                    'sheetId': 0,
                                    'title': 'Отчет-1',
-                                   'gridProperties': {'rowCount': 100,
-                                                      'columnCount': 3}}}]
+                                   'gridProperties': {
+                                       'rowCount': grid_rows,
+                                       'columnCount': COLUMN_COUNT}}}]
     }
     response = await wrapper_services.as_service_account(
         service.spreadsheets.create(json=spreadsheet_body)
@@ -45,34 +72,53 @@ async def set_user_permissions(
 
 async def spreadsheets_update_value(
         spreadsheet_id: str,
-        projects: list,
+        pages: AsyncIterable[list],
         wrapper_services: Aiogoogle
-) -> None:
-    """Заполнение документа данными."""
+) -> int:
+    """Заполнение документа данными. Проекты приходят порциями,
+    каждая порция дописывается одним запросом values.append,
+    поэтому в памяти хранится не больше одной порции.
+    Возвращает количество записанных проектов."""
     now_date_time = datetime.now().strftime(FORMAT)
     service = await wrapper_services.discover('sheets', 'v4')
-    table_values = [
-        ['Отчёт от', now_date_time],
-        ['Топ проектов по скорости закрытия'],
-        ['Название проекта', 'Время', 'Описание']
-    ]
-    for project in projects:
-        new_row = [
-            str(project.name),
-            str(project.close_date - project.create_date),
-            str(project.description)
-        ]
-        table_values.append(new_row)
-
-    update_body = {
-        'majorDimension': 'ROWS',
-        'values': table_values
-    }
     await wrapper_services.as_service_account(
         service.spreadsheets.values.update(
             spreadsheetId=spreadsheet_id,
-            range='A1:C100',
+            range=f'A1:C{HEADER_ROW_COUNT}',
             valueInputOption='USER_ENTERED',
-            json=update_body
+            json={
+                'majorDimension': 'ROWS',
+                'values': report_header(now_date_time)
+            }
         )
     )
+    written = 0
+    async for page in pages:
+        if not page:
+            continue
+        await wrapper_services.as_service_account(
+            service.spreadsheets.values.append(
+                spreadsheetId=spreadsheet_id,
+                range=f'A{HEADER_ROW_COUNT + 1}:C',
+                valueInputOption='USER_ENTERED',
+                insertDataOption='OVERWRITE',
+                json={
+                    'majorDimension': 'ROWS',
+                    'values': [report_row(project) for project in page]
+                }
+            )
+        )
+        written += len(page)
+    return written
+
+
+async def create_report(
+        pages: AsyncIterable[list],
+        row_count: int,
+        wrapper_services: Aiogoogle,
+) -> str:
+    """Создание и заполнение отчета. Возвращает id документа."""
+    spreadsheet_id = await spreadsheets_create(wrapper_services, row_count)
+    await set_user_permissions(spreadsheet_id, wrapper_services)
+    await spreadsheets_update_value(spreadsheet_id, pages, wrapper_services)
+    return spreadsheet_id
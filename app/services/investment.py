@@ -1,52 +1,165 @@
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 from http import HTTPStatus
-from typing import List, Union
+from typing import (AsyncIterable, AsyncIterator, List, Optional, Tuple,
+                    Union)
+from weakref import WeakKeyDictionary
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import (bindparam, delete, exists, func, insert, select,
+                        tuple_, update)
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.constants import (FULL_AMOUNT_ERROR, INVESTED_AMOUNT_EXIST_ERROR,
-                                PROJECT_CLOSE_ERROR, PROJECT_NAME_ERROR)
+from app.core.config import settings
+from app.core.constants import (ALLOCATION_CHUNK_SIZE, ALLOCATION_LOCK_KEY,
+                                FULL_AMOUNT_ERROR,
+                                INVESTED_AMOUNT_EXIST_ERROR,
+                                PROJECT_CLOSE_ERROR,
+                                PROJECT_NAME_DUPLICATE_ERROR,
+                                PROJECT_NAME_ERROR)
+from app.core.db import get_dialect_name
+from app.core.versioning import project_version
 from app.crud.donations import donation_crud
+from app.crud.fund_summary import fund_summary_crud
 from app.crud.projects import charity_project_crud
-from app.models import CharityProject, Donation, User
+from app.models import (AllocationTask, CharityProject, Donation, Investment,
+                        User)
+from app.schemas.charityproject import ProjectCreate
+from app.services.allocation import (AllocationPlan, QueuePlan,
+                                     plan_allocation)
 
 
 class InvestmentService:
 
-    async def _obj_not_fully_invested(
+    def __init__(self):
+        self._sqlite_locks = WeakKeyDictionary()
+
+    @asynccontextmanager
+    async def _allocation_lock(self, session: AsyncSession):
+        """
+        Сериализация распределения средств.
+        SQLite не поддерживает блокировку строк, поэтому распределения
+        выполняются по очереди под asyncio.Lock (отдельным для каждого
+        event loop). В PostgreSQL транзакция распределения берет
+        advisory-блокировку ALLOCATION_LOCK_KEY, которая снимается
+        при commit или rollback: новое пожертвование и новый проект
+        не распределяются одновременно и не пропускают друг друга.
+        """
+        dialect = get_dialect_name(session)
+        if dialect == 'postgresql':
+            await session.execute(
+                select(func.pg_advisory_xact_lock(ALLOCATION_LOCK_KEY))
+            )
+        if dialect != 'sqlite':
+            yield
+            return
+        lock = self._sqlite_locks.setdefault(
+            asyncio.get_running_loop(), asyncio.Lock()
+        )
+        async with lock:
+            yield
+
+    async def _open_queue(
             self,
             model: Union[CharityProject, Donation],
             session: AsyncSession
-    ) -> List[Union[Donation, CharityProject]]:
-        objects = await session.execute(select(model).where(
+    ) -> AsyncIterator[Row]:
+        """
+        Функция выдает очередь открытых объектов модели
+        в порядке создания (FIFO). Загружаются только колонки,
+        необходимые для распределения, порциями по
+        ALLOCATION_CHUNK_SIZE строк: следующая порция запрашивается,
+        только если распределяемой суммы хватило на предыдущую.
+        В PostgreSQL строки блокируются до конца транзакции
+        (FOR UPDATE) от изменений вне распределения.
+        """
+        query = select(
+            model.id, model.full_amount, model.invested_amount,
+            model.create_date,
+        ).where(
             model.fully_invested.is_(False)
-        ).order_by(model.create_date))
-        return objects.scalars().first()
+        ).order_by(
+            model.create_date, model.id
+        ).limit(ALLOCATION_CHUNK_SIZE)
+        if model is Donation:
+            # Пожертвования, ожидающие фонового распределения,
+            # распределяет только обработчик outbox.
+            query = query.where(~exists().where(
+                AllocationTask.donation_id == model.id
+            ))
+        if get_dialect_name(session) == 'postgresql':
+            query = query.with_for_update()
+        chunk_query = query
+        while True:
+            objects = (await session.execute(chunk_query)).all()
+            for row in objects:
+                yield row
+            if len(objects) < ALLOCATION_CHUNK_SIZE:
+                return
+            last = objects[-1]
+            chunk_query = query.where(
+                tuple_(model.create_date, model.id) >
+                tuple_(last.create_date, last.id)
+            )
 
-    async def _get_project_and_donation(
+    async def _bulk_update_invested(
             self,
-            obj: Union[CharityProject, Donation],
+            model: Union[CharityProject, Donation],
+            changes: List[dict],
             session: AsyncSession
-    ) -> tuple:
+    ) -> None:
         """
-        Функция получает переменные проекта и пожертвования.
+        Функция записывает все измененные строки очереди
+        одним UPDATE (executemany) в текущей транзакции.
         """
-        if isinstance(obj, CharityProject):
-            return obj, await self._obj_not_fully_invested(Donation, session)
-        return await self._obj_not_fully_invested(CharityProject, session), obj
+        table = model.__table__
+        if model is CharityProject:
+            project_version.touch(session)
+            charity_project_crud.mark_changed(
+                session, (change['_id'] for change in changes)
+            )
+        await session.execute(
+            update(table).where(
+                table.c.id == bindparam('_id')
+            ).values(
+                invested_amount=bindparam('_invested_amount'),
+                fully_invested=bindparam('_fully_invested'),
+                close_date=bindparam('_close_date'),
+            ),
+            changes
+        )
+
+    async def _commit(self, session: AsyncSession) -> None:
+        """Фиксация распределения и удаление измененных
+        проектов из кэша."""
+        await session.commit()
+        await charity_project_crud.invalidate_changed(session)
 
-    async def _close_project_or_donation(
+    async def _refresh_and_allocate(
             self,
-            obj_close: Union[CharityProject, Donation]
-    ) -> None:
+            session: AsyncSession,
+            obj: Union[CharityProject, Donation],
+    ) -> Union[CharityProject, Donation]:
         """
-        Функция меняет значение fully_invested на True
-        и подставляет дату закрытия.
+        Вызывается под блокировкой распределения. Объект
+        перечитывается (в PostgreSQL — FOR UPDATE), чтобы учесть
+        распределения, выполненные другими запросами после его
+        загрузки: новый объект уже зафиксирован и мог быть взят
+        из открытой очереди.
         """
-        obj_close.fully_invested = True
-        obj_close.close_date = datetime.now()
+        await session.refresh(
+            obj,
+            with_for_update=(
+                get_dialect_name(session) == 'postgresql' or None
+            )
+        )
+        if obj.fully_invested:
+            await session.commit()
+            await session.refresh(obj)
+            return obj
+        return await self._allocate(session, obj)
 
     async def _create_investment(
             self,
@@ -54,42 +167,216 @@ class InvestmentService:
             obj: Union[CharityProject, Donation],
     ) -> Union[CharityProject, Donation]:
         """
-        Функция инвестирования. Проверяет что есть пожертвования
-        или проекты которые необходимо обработать.
-        Распределяет пожертования по проектам начиная с самого первого.
+        Функция инвестирования. Загружает очередь открытых
+        пожертвований или проектов один раз, распределяет
+        средства в памяти начиная с самого первого объекта
+        и сохраняет все изменения в одной транзакции.
+        Используется и для повторного распределения, например
+        после увеличения требуемой суммы проекта.
         """
+        async with self._allocation_lock(session):
+            return await self._refresh_and_allocate(session, obj)
 
-        project, donation = await self._get_project_and_donation(obj, session)
+    async def _take_queue(
+            self,
+            model: Union[CharityProject, Donation],
+            session: AsyncSession,
+            amount: Optional[int] = None,
+    ) -> List[Row]:
+        """
+        Начало очереди открытых объектов, свободных сумм которого
+        хватает на amount. Без amount загружается вся очередь.
+        """
+        queue = []
+        covered = 0
+        async for row in self._open_queue(model, session):
+            if amount is not None and covered >= amount:
+                break
+            queue.append(row)
+            covered += row.full_amount - row.invested_amount
+        return queue
 
-        if not project or not donation:
-            await session.commit()
-            await session.refresh(obj)
-            return obj
+    def _queue_changes(
+            self,
+            queue: List[Row],
+            plan: QueuePlan,
+            close_date: datetime,
+    ) -> List[dict]:
+        """Изменения строк очереди для _bulk_update_invested по плану."""
+        changes = []
+        for number, (row, amount) in enumerate(zip(queue, plan.amounts)):
+            fully_invested = number < plan.closed
+            if not amount and not fully_invested:
+                continue
+            changes.append({
+                '_id': row.id,
+                '_invested_amount': row.invested_amount + amount,
+                '_fully_invested': fully_invested,
+                '_close_date': close_date if fully_invested else None,
+            })
+        return changes
 
-        amount_project = project.full_amount - project.invested_amount
-        amount_donation = donation.full_amount - donation.invested_amount
+    async def _apply_plan(
+            self,
+            model: Union[CharityProject, Donation],
+            queue: List[Row],
+            plan: QueuePlan,
+            close_date: datetime,
+            session: AsyncSession,
+    ) -> None:
+        """Запись плана очереди в текущей транзакции."""
+        changes = self._queue_changes(queue, plan, close_date)
+        if changes:
+            await self._bulk_update_invested(model, changes, session)
 
-        if amount_project > amount_donation:
-            project.invested_amount += amount_donation
-            donation.invested_amount += amount_donation
-            await self._close_project_or_donation(donation)
+    async def _record_investments(
+            self,
+            project_ids: List[int],
+            donation_ids: List[int],
+            plan: AllocationPlan,
+            create_date: datetime,
+            session: AsyncSession,
+    ) -> None:
+        """Запись переводов плана в журнал распределений
+        одним INSERT (executemany) в текущей транзакции."""
+        if not plan.transfers:
+            return
+        await session.execute(
+            insert(Investment.__table__),
+            [
+                {
+                    'project_id': project_ids[transfer.project],
+                    'donation_id': donation_ids[transfer.donation],
+                    'amount': transfer.amount,
+                    'create_date': create_date,
+                }
+                for transfer in plan.transfers
+            ]
+        )
 
+    async def _allocate(
+            self,
+            session: AsyncSession,
+            obj: Union[CharityProject, Donation],
+    ) -> Union[CharityProject, Donation]:
+        """Распределение средств объекта по открытой очереди."""
+        is_project = isinstance(obj, CharityProject)
+        counterpart_model = Donation if is_project else CharityProject
+        remaining = obj.full_amount - obj.invested_amount
+        queue = await self._take_queue(counterpart_model, session, remaining)
+        sizes = [row.full_amount - row.invested_amount for row in queue]
+        queue_ids = [row.id for row in queue]
+        if is_project:
+            plan = plan_allocation([remaining], sizes)
+            own_plan, counterpart_plan = plan.projects, plan.donations
+            project_ids, donation_ids = [obj.id], queue_ids
         else:
-            project.invested_amount += amount_project
-            donation.invested_amount += amount_project
-            await self._close_project_or_donation(project)
-            if amount_project == amount_donation:
-                await self._close_project_or_donation(donation)
-
-        session.add(project)
-        session.add(donation)
-        await session.commit()
-        await session.refresh(project)
-        await session.refresh(donation)
-        if donation.fully_invested if isinstance(obj, CharityProject) else project.fully_invested:
-            await self._create_investment(session, obj)
+            plan = plan_allocation(sizes, [remaining])
+            own_plan, counterpart_plan = plan.donations, plan.projects
+            project_ids, donation_ids = queue_ids, [obj.id]
+        close_date = datetime.now()
+        await self._apply_plan(
+            counterpart_model, queue, counterpart_plan, close_date, session
+        )
+        await self._record_investments(
+            project_ids, donation_ids, plan, close_date, session
+        )
+        obj.invested_amount += plan.total
+        if is_project:
+            project_version.touch(session)
+            charity_project_crud.mark_changed(session, [obj.id])
+        closed_projects = plan.projects.closed
+        if own_plan.closed and not obj.fully_invested:
+            obj.fully_invested = True
+            obj.close_date = close_date
+        elif is_project:
+            closed_projects = 0
+        session.add(obj)
+        await fund_summary_crud.apply(
+            session,
+            invested_amount=plan.total,
+            open_projects=-closed_projects,
+        )
+        await self._commit(session)
+        await session.refresh(obj)
         return obj
 
+    async def _allocate_queues(
+            self,
+            session: AsyncSession,
+    ) -> int:
+        """
+        Распределение всех открытых пожертвований по открытым проектам
+        за один проход. Вызывается под блокировкой распределения,
+        изменения не фиксируются. Возвращает распределенную сумму.
+        """
+        donations = await self._take_queue(Donation, session)
+        donation_sizes = [
+            row.full_amount - row.invested_amount for row in donations
+        ]
+        projects = await self._take_queue(
+            CharityProject, session, sum(donation_sizes)
+        )
+        project_sizes = [
+            row.full_amount - row.invested_amount for row in projects
+        ]
+        plan = plan_allocation(project_sizes, donation_sizes)
+        close_date = datetime.now()
+        await self._apply_plan(
+            CharityProject, projects, plan.projects, close_date, session
+        )
+        await self._apply_plan(
+            Donation, donations, plan.donations, close_date, session
+        )
+        await self._record_investments(
+            [row.id for row in projects], [row.id for row in donations],
+            plan, close_date, session
+        )
+        await fund_summary_crud.apply(
+            session,
+            invested_amount=plan.total,
+            open_projects=-plan.projects.closed,
+        )
+        return plan.total
+
+    async def reallocate(
+            self,
+            session: AsyncSession,
+    ) -> int:
+        """Распределить свободные пожертвования по открытым проектам,
+        если они почему-то остались нераспределенными.
+        Возвращает распределенную сумму."""
+        async with self._allocation_lock(session):
+            invested_amount = await self._allocate_queues(session)
+            await self._commit(session)
+        return invested_amount
+
+    async def import_donations(
+            self,
+            session: AsyncSession,
+            chunks: AsyncIterable[List[dict]],
+    ) -> Tuple[int, int, int]:
+        """
+        Массовое создание пожертвований: вставка порциями
+        (executemany), один проход распределения по всем открытым
+        проектам и одна транзакция на весь импорт.
+        Возвращает количество строк, их сумму и распределенную сумму.
+        """
+        table = Donation.__table__
+        rows = 0
+        donated_amount = 0
+        async with self._allocation_lock(session):
+            async for chunk in chunks:
+                await session.execute(insert(table), chunk)
+                rows += len(chunk)
+                donated_amount += sum(row['full_amount'] for row in chunk)
+            await fund_summary_crud.apply(
+                session, donated_amount=donated_amount
+            )
+            invested_amount = await self._allocate_queues(session)
+            await self._commit(session)
+        return rows, donated_amount, invested_amount
+
     async def _name_charity_project_exist(
             self,
             name: str,
@@ -114,26 +401,110 @@ class InvestmentService:
         """Создать проект."""
         await self._name_charity_project_exist(charity_project.name, session)
         project = await charity_project_crud.create(charity_project, session)
+        await charity_project_crud.invalidate([], [charity_project.name])
         return await self._create_investment(session, project)
 
+    async def _check_names_for_create(
+            self,
+            names: List[str],
+            session: AsyncSession,
+    ) -> None:
+        """Проверка имен новых проектов: без повторов внутри
+        пакета и без совпадений с существующими проектами
+        (один запрос IN)."""
+        if len(set(names)) != len(names):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=PROJECT_NAME_DUPLICATE_ERROR
+            )
+        if await charity_project_crud.get_taken_names(names, session):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=PROJECT_NAME_ERROR
+            )
+
+    async def create_projects(
+            self,
+            session: AsyncSession,
+            charity_projects: List[ProjectCreate],
+    ) -> List[CharityProject]:
+        """
+        Создать пакет проектов. Проекты вставляются одним INSERT
+        (executemany), свободные пожертвования распределяются
+        по новой очереди за один проход, все изменения
+        фиксируются одной транзакцией.
+        """
+        names = [project.name for project in charity_projects]
+        await self._check_names_for_create(names, session)
+        create_date = datetime.now()
+        rows = [
+            {
+                **project.dict(),
+                'create_date': create_date,
+                'invested_amount': 0,
+                'fully_invested': False,
+            }
+            for project in charity_projects
+        ]
+        async with self._allocation_lock(session):
+            await session.execute(insert(CharityProject.__table__), rows)
+            project_version.touch(session)
+            await fund_summary_crud.apply(
+                session,
+                projects_amount=sum(row['full_amount'] for row in rows),
+                open_projects=len(rows),
+            )
+            await self._allocate_queues(session)
+            await self._commit(session)
+        await charity_project_crud.invalidate([], names)
+        return await charity_project_crud.get_multi_by_names(names, session)
+
     async def create_donat(
             self,
             session: AsyncSession,
             donation: Donation,
             user: User
     ) -> Donation:
-        """Создать пожертвование."""
-        donation = await donation_crud.create(donation, session, user)
-        donation = await self._create_investment(session, donation)
+        """Создать пожертвование.
+        В режиме отложенного распределения (async_allocation)
+        пожертвование сохраняется вместе с задачей в outbox,
+        распределение выполняет фоновый обработчик."""
+        if not settings.async_allocation:
+            donation = await donation_crud.create(donation, session, user)
+            return await self._create_investment(session, donation)
+        donation = await donation_crud.create(
+            donation, session, user, commit=False
+        )
+        session.add(AllocationTask(donation_id=donation.id))
+        await session.commit()
+        await session.refresh(donation)
         return donation
 
-    async def _check_invested_amount_for_delete(
+    async def distribute_donation(
             self,
-            project_id: int,
-            session: AsyncSession
-    ):
+            session: AsyncSession,
+            donation_id: int,
+    ) -> Optional[Donation]:
+        """Распределить пожертвование из outbox.
+        Задача удаляется в той же транзакции, что и распределение;
+        пока задача есть, пожертвование не входит в открытую очередь."""
+        async with self._allocation_lock(session):
+            await session.execute(
+                delete(AllocationTask).where(
+                    AllocationTask.donation_id == donation_id
+                )
+            )
+            donation = await session.get(Donation, donation_id)
+            if donation is None:
+                await session.commit()
+                return None
+            return await self._refresh_and_allocate(session, donation)
+
+    def _check_invested_amount_for_delete(
+            self,
+            charity_project: CharityProject,
+    ) -> None:
         """Проверка на наличие инвестиций."""
-        charity_project = await charity_project_crud.get(project_id, session)
         if charity_project.invested_amount:
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
@@ -148,37 +519,47 @@ class InvestmentService:
         """Удаляет проект. Нельзя удалить проект,
         в который уже были инвестированы средства."""
 
-        await self._check_invested_amount_for_delete(
-            charity_project.id, session)
-        charity_project = await charity_project_crud.remove(
-            charity_project, session
-        )
-        return charity_project
+        self._check_invested_amount_for_delete(charity_project)
+        removed = await charity_project_crud.remove(charity_project, session)
+        if removed is None:
+            # Средства вложены после проверки (другим запросом).
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=INVESTED_AMOUNT_EXIST_ERROR
+            )
+        return removed
 
-    async def _check_fully_invested_for_update(
+    def _check_fully_invested_for_update(
             self,
-            project_id: int,
-            session: AsyncSession,
+            charity_project: CharityProject,
     ) -> None:
         """Проверка, что проект не закрыт."""
-        charity_project = await charity_project_crud.get(project_id, session)
         if charity_project.fully_invested:
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
                 detail=PROJECT_CLOSE_ERROR
             )
 
-    async def _check_full_amount_for_update(
+    def _check_name_for_update(
+            self,
+            name_taken: bool,
+    ) -> None:
+        """Проверка, что новое имя не занято."""
+        if name_taken:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=PROJECT_NAME_ERROR
+            )
+
+    def _check_full_amount_for_update(
             self,
-            project_id: int,
+            charity_project: CharityProject,
             obj_in_full_amount,
-            session: AsyncSession,
     ) -> None:
         """
         Проверка измененного значения full_amount.
         Не должно быть меньше вложеных пожертвований.
         """
-        charity_project = await charity_project_crud.get(project_id, session)
         if obj_in_full_amount < charity_project.invested_amount:
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
@@ -190,18 +571,29 @@ class InvestmentService:
             charity_project: CharityProject,
             obj_in: CharityProject,
             session: AsyncSession,
+            name_taken: bool = False,
     ) -> CharityProject:
         """Закрытый проект нельзя редактировать;
-        нельзя установить требуемую сумму меньше уже вложенной."""
-        await self._check_fully_invested_for_update(
-            charity_project.id, session)
+        нельзя установить требуемую сумму меньше уже вложенной.
+        После изменения требуемой суммы свободные пожертвования
+        распределяются в проект заново.
+        Проверки выполняются по уже загруженному проекту,
+        занятость имени (name_taken) проверяется вместе с его загрузкой,
+        см. CRUDCharityProject.get_with_name_taken."""
+        self._check_fully_invested_for_update(charity_project)
         if obj_in.name:
-            await self._name_charity_project_exist(obj_in.name, session)
+            self._check_name_for_update(name_taken)
         if obj_in.full_amount:
-            await self._check_full_amount_for_update(
-                charity_project.id, obj_in.full_amount, session)
-        return await charity_project_crud.update(
+            self._check_full_amount_for_update(
+                charity_project, obj_in.full_amount)
+        old_full_amount = charity_project.full_amount
+        charity_project = await charity_project_crud.update(
             charity_project, obj_in, session)
+        if charity_project.full_amount != old_full_amount:
+            charity_project = await self._create_investment(
+                session, charity_project
+            )
+        return charity_project
 
 
 investment_service = InvestmentService()
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Optional, Set
+
+from app.core.config import settings
+from app.core.constants import (REPORT_PAGE_SIZE, REPORT_STATUS_DONE,
+                                REPORT_STATUS_FAILED, REPORT_STATUS_PENDING)
+from app.core.db import AsyncSessionLocal
+from app.core.google_client import google_client
+from app.crud.projects import charity_project_crud
+from app.crud.report_jobs import report_job_crud
+from app.services.google_api import create_report
+
+logger = logging.getLogger(__name__)
+
+ReportBuilder = Callable[[AsyncIterator[list], int], Awaitable[str]]
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.report_retry_delay * 2 ** (attempts - 1)
+    )
+
+
+async def build_google_report(
+        pages: AsyncIterator[list],
+        row_count: int,
+) -> str:
+    return await create_report(pages, row_count, google_client)
+
+
+class ReportQueue:
+    """
+    Фоновый обработчик задач формирования отчетов. Задачи хранятся
+    в таблице reportjob, одновременно выполняется не больше
+    report_concurrency задач. Неудачная попытка повторяется
+    с экспоненциальной задержкой, после report_max_attempts
+    попыток задача получает статус failed. Пока задача выполняется,
+    обработчик продлевает ее аренду; задачи с истекшей арендой
+    (обработчик остановлен или завис) возвращаются в очередь,
+    задачи живых обработчиков других процессов не трогаются.
+    """
+
+    def __init__(
+            self,
+            session_factory=AsyncSessionLocal,
+            build_report: ReportBuilder = build_google_report,
+    ):
+        self._session_factory = session_factory
+        self._build_report = build_report
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Запуск обработчика в текущем event loop."""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановка обработчика и выполняемых задач."""
+        if self._task is None:
+            return
+        tasks = [self._task, *self._running]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    def notify(self) -> None:
+        """Сообщить обработчику о новых задачах."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _heartbeat(self, job_id: int, attempts: int) -> None:
+        """Продление аренды задачи, пока выполняется попытка."""
+        while True:
+            await asyncio.sleep(settings.report_lease_seconds / 3)
+            try:
+                async with self._session_factory() as session:
+                    await report_job_crud.extend_lease(
+                        job_id, attempts, session
+                    )
+            except Exception:
+                logger.exception('Ошибка продления аренды отчета %s.', job_id)
+
+    async def run_job(self, job_id: int) -> None:
+        """Одна попытка выполнения задачи, уже взятой в работу."""
+        async with self._session_factory() as session:
+            job = await report_job_crud.get(job_id, session)
+            if job is None:
+                return
+            attempts = job.attempts
+            heartbeat = asyncio.create_task(
+                self._heartbeat(job_id, attempts)
+            )
+            try:
+                row_count = await (
+                    charity_project_crud.count_projects_by_completion_rate(
+                        session, job.project_limit
+                    )
+                )
+                pages = (
+                    charity_project_crud.stream_projects_by_completion_rate(
+                        session, job.project_limit, REPORT_PAGE_SIZE
+                    )
+                )
+                try:
+                    spreadsheet_id = await self._build_report(pages, row_count)
+                finally:
+                    await pages.aclose()
+            except Exception as error:
+                logger.exception('Ошибка формирования отчета %s.', job_id)
+                await session.rollback()
+                if attempts >= settings.report_max_attempts:
+                    values = dict(
+                        status=REPORT_STATUS_FAILED,
+                        finish_date=datetime.now(),
+                    )
+                else:
+                    values = dict(
+                        status=REPORT_STATUS_PENDING,
+                        run_after=datetime.now() + retry_delay(attempts),
+                    )
+                await report_job_crud.set_result(
+                    job_id, attempts, session, error=repr(error), **values
+                )
+                return
+            finally:
+                heartbeat.cancel()
+            await report_job_crud.set_result(
+                job_id, attempts, session,
+                status=REPORT_STATUS_DONE,
+                spreadsheet_id=spreadsheet_id,
+                error=None,
+                finish_date=datetime.now(),
+            )
+
+    async def run_due(self) -> int:
+        """Выполнить задачи, срок которых наступил, не больше
+        report_concurrency одновременно."""
+        async with self._session_factory() as session:
+            await report_job_crud.requeue_expired(session)
+            job_ids = await report_job_crud.claim_due(
+                settings.report_concurrency, session
+            )
+        await asyncio.gather(*(self.run_job(job_id) for job_id in job_ids))
+        return len(job_ids)
+
+    def _job_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        self.notify()
+
+    async def _claim(self) -> None:
+        free = settings.report_concurrency - len(self._running)
+        if free <= 0:
+            return
+        async with self._session_factory() as session:
+            await report_job_crud.requeue_expired(session)
+            job_ids = await report_job_crud.claim_due(free, session)
+        for job_id in job_ids:
+            task = asyncio.create_task(self.run_job(job_id))
+            self._running.add(task)
+            task.add_done_callback(self._job_done)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self._claim()
+            except Exception:
+                logger.exception('Ошибка чтения задач отчетов.')
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), settings.report_poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+
+report_queue = ReportQueue()
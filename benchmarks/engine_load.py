@@ -0,0 +1,75 @@
+"""Нагрузочный бенчмарк движка БД.
+
+Создает пожертвования параллельными сессиями через InvestmentService
+и сравнивает пропускную способность движка с настройками
+по умолчанию (create_async_engine без параметров) и движка,
+настроенного из Settings (пул соединений, PRAGMA для SQLite).
+
+Запуск:
+    python -m benchmarks.engine_load --donations 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.db import make_engine
+from app.crud.fund_summary import fund_summary_crud
+from app.models import CharityProject, User
+from app.schemas.donation import DonationCreate
+from app.services.investment import investment_service
+
+user = User(id=1, is_active=True, is_verified=True, is_superuser=False)
+
+
+async def run(engine, donations: int, concurrency: int) -> float:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession)
+    async with session_factory() as session:
+        session.add(CharityProject(
+            name='benchmark', description='benchmark',
+            full_amount=donations * 100,
+        ))
+        await session.commit()
+        await fund_summary_crud.rebuild(session)
+    in_flight = asyncio.Semaphore(concurrency)
+
+    async def donate():
+        async with in_flight, session_factory() as session:
+            await investment_service.create_donat(
+                session, DonationCreate(full_amount=10), user
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(donate() for _ in range(donations)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return donations / elapsed
+
+
+async def main(donations: int, concurrency: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        default_url = (
+            f'sqlite+aiosqlite:///{os.path.join(tmp_dir, "default.db")}'
+        )
+        tuned_url = f'sqlite+aiosqlite:///{os.path.join(tmp_dir, "tuned.db")}'
+        default_rate = await run(
+            create_async_engine(default_url), donations, concurrency
+        )
+        tuned_rate = await run(make_engine(tuned_url), donations, concurrency)
+    print(f'по умолчанию: {default_rate:8.1f} пожертвований/с')
+    print(f'с настройками: {tuned_rate:8.1f} пожертвований/с')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--donations', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.donations, arguments.concurrency))
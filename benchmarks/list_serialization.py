@@ -0,0 +1,92 @@
+"""Бенчмарк сериализации списка проектов.
+
+Заполняет временную SQLite-базу проектами и замеряет количество
+запросов в секунду к GET /charity_project/ в обычном режиме
+(ORM-объекты, проверка через ProjectDB) и в режиме
+orjson_responses (строки таблицы, orjson).
+
+Запуск:
+    python -m benchmarks.list_serialization --rows 10000 --requests 20
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.config import settings
+from app.core.db import get_async_session, make_engine
+from app.main import app
+from app.models import CharityProject
+
+URL = '/charity_project/'
+
+
+async def seed(engine, rows: int) -> None:
+    start = datetime(2010, 1, 1)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(CharityProject.__table__), [
+            {
+                'name': f'project {number}',
+                'description': 'Проект для бенчмарка',
+                'full_amount': 1000,
+                'invested_amount': 1000 if number % 2 else 0,
+                'fully_invested': bool(number % 2),
+                'create_date': start + timedelta(seconds=number),
+                'close_date': start + timedelta(days=1)
+                if number % 2 else None,
+            }
+            for number in range(rows)
+        ])
+    # Соединения привязаны к event loop, в котором созданы.
+    await engine.dispose()
+
+
+def measure(client: TestClient, requests: int) -> float:
+    client.get(URL)
+    started = time.perf_counter()
+    for _ in range(requests):
+        client.get(URL)
+    return requests / (time.perf_counter() - started)
+
+
+def main(rows: int, requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = make_engine(
+            f'sqlite+aiosqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        )
+        asyncio.run(seed(engine, rows))
+        session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def override_session():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = override_session
+        with TestClient(app) as client:
+            settings.orjson_responses = False
+            default_rate = measure(client, requests)
+            settings.orjson_responses = True
+            fast_rate = measure(client, requests)
+        app.dependency_overrides.clear()
+    print(f'{rows} проектов:')
+    print(f'  response_model: {default_rate:8.2f} запросов/с')
+    print(f'  orjson:         {fast_rate:8.2f} запросов/с')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--requests', type=int, default=20)
+    arguments = parser.parse_args()
+    main(arguments.rows, arguments.requests)
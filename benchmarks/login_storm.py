@@ -0,0 +1,131 @@
+"""Нагрузочный тест: задержка POST /donation/ во время массовых входов.
+
+Несколько потоков непрерывно выполняют POST /auth/jwt/login,
+а основной поток в это время создает пожертвования и замеряет
+задержку каждого запроса. Все запросы обрабатывает один event loop
+приложения (TestClient), поэтому при хешировании в event loop
+(password_hash_executor=inline) входы задерживают пожертвования,
+а при хешировании в пуле задержка остается близкой к фоновой.
+
+Запуск:
+    python -m benchmarks.login_storm --logins 8 --requests 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import threading
+import time
+from typing import List
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.db import get_async_session, make_engine
+from app.core.password import password_helper
+from app.main import app
+
+EMAIL = 'storm@example.com'
+PASSWORD = 'chimichangas4life'
+
+
+async def create_tables(engine) -> None:
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    # Соединения привязаны к event loop, в котором созданы.
+    await engine.dispose()
+
+
+def login(client: TestClient) -> str:
+    return client.post('/auth/jwt/login', data={
+        'username': EMAIL, 'password': PASSWORD,
+    }).json()['access_token']
+
+
+def donation_latencies(
+        client: TestClient,
+        headers: dict,
+        requests: int,
+) -> List[float]:
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        client.post('/donation/', headers=headers, json={'full_amount': 1})
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def storm(
+        client: TestClient,
+        headers: dict,
+        logins: int,
+        requests: int,
+) -> List[float]:
+    stop = threading.Event()
+
+    def login_loop():
+        while not stop.is_set():
+            login(client)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(logins)]
+    for thread in threads:
+        thread.start()
+    try:
+        return donation_latencies(client, headers, requests)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def report(title: str, latencies: List[float]) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f'  {title:<22} p50 {statistics.median(latencies) * 1000:8.1f} мс'
+        f'   p95 {p95 * 1000:8.1f} мс'
+    )
+
+
+def main(logins: int, requests: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = make_engine(
+            f'sqlite+aiosqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        )
+        asyncio.run(create_tables(engine))
+        session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+
+        async def override_session():
+            async with session_factory() as session:
+                yield session
+
+        app.dependency_overrides[get_async_session] = override_session
+        with TestClient(app) as client:
+            client.post('/auth/register', json={
+                'email': EMAIL, 'password': PASSWORD,
+            })
+            headers = {'Authorization': f'Bearer {login(client)}'}
+            print(f'{logins} потоков входа, {requests} пожертвований:')
+            report('без нагрузки', donation_latencies(
+                client, headers, requests
+            ))
+            for executor in ('inline', 'thread'):
+                password_helper.executor = executor
+                report(f'вход, {executor}', storm(
+                    client, headers, logins, requests
+                ))
+            print(f'  метрики пула: {password_helper.metrics()}')
+        app.dependency_overrides.clear()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50)
+    arguments = parser.parse_args()
+    main(arguments.logins, arguments.requests)
@@ -0,0 +1,102 @@
+"""Бенчмарк выборки пожертвований пользователя (GET /donation/my).
+
+Заполняет временную SQLite-базу пожертвованиями, равномерно
+распределенными между пользователями, и замеряет запрос
+CRUDDonation.get_multi_donations_current_user с индексом
+ix_donation_user_id и без него.
+
+Запуск:
+    python -m benchmarks.my_donations --donations 1000000 --users 10000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.crud.donations import donation_crud
+from app.models import Donation, User
+
+CHUNK_SIZE = 50000
+REPEATS = 200
+PAGE_SIZE = 50
+
+
+async def seed(session: AsyncSession, donations: int, users: int) -> None:
+    await session.execute(insert(User.__table__), [
+        {
+            'id': user_id,
+            'email': f'user{user_id}@example.com',
+            'hashed_password': '',
+            'is_active': True,
+            'is_superuser': False,
+            'is_verified': True,
+        }
+        for user_id in range(1, users + 1)
+    ])
+    start = datetime(2010, 1, 1)
+    for chunk_start in range(0, donations, CHUNK_SIZE):
+        await session.execute(insert(Donation.__table__), [
+            {
+                'user_id': number % users + 1,
+                'full_amount': 100,
+                'invested_amount': 100,
+                'fully_invested': True,
+                'create_date': start + timedelta(minutes=number),
+            }
+            for number in range(
+                chunk_start, min(chunk_start + CHUNK_SIZE, donations)
+            )
+        ])
+    await session.commit()
+
+
+async def measure(session: AsyncSession, users: int) -> float:
+    created_from = datetime(2010, 6, 1)
+    started = time.perf_counter()
+    for number in range(REPEATS):
+        user = User(id=number % users + 1)
+        await donation_crud.get_multi_donations_current_user(
+            user=user, session=session, limit=PAGE_SIZE,
+            created_from=created_from,
+        )
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+async def run(donations: int, users: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_async_engine(
+            f'sqlite+aiosqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        session_factory = sessionmaker(engine, class_=AsyncSession)
+        async with session_factory() as session:
+            await seed(session, donations, users)
+            with_index = await measure(session, users)
+            await session.execute(text('DROP INDEX ix_donation_user_id'))
+            without_index = await measure(session, users)
+        await engine.dispose()
+    print(
+        f'{donations} пожертвований, {users} пользователей: '
+        f'с индексом {with_index:8.3f} мс, '
+        f'без индекса {without_index:8.3f} мс на страницу'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--donations', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10000)
+    arguments = parser.parse_args()
+    asyncio.run(run(arguments.donations, arguments.users))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Бенчмарк выборки очереди открытых пожертвований.
+
+Заполняет временную SQLite-базу закрытыми пожертвованиями и замеряет
+запрос, который выполняет InvestmentService._open_queue, с индексом
+ix_donation_open_queue и без него. С частичным индексом время выборки
+не зависит от количества закрытых строк.
+
+Запуск:
+    python -m benchmarks.open_queue_lookup --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, select
+
+from app.core.base import Base
+from app.models import Donation
+
+OPEN_ROWS = 100
+CHUNK_SIZE = 50000
+REPEATS = 50
+
+
+def seed(connection, closed_rows: int) -> None:
+    start = datetime(2010, 1, 1)
+    rows = []
+    for number in range(closed_rows + OPEN_ROWS):
+        closed = number < closed_rows
+        rows.append({
+            'full_amount': 100,
+            'invested_amount': 100 if closed else 0,
+            'fully_invested': closed,
+            'create_date': start + timedelta(seconds=number),
+            'close_date': start + timedelta(days=1) if closed else None,
+        })
+        if len(rows) == CHUNK_SIZE:
+            connection.execute(insert(Donation.__table__), rows)
+            rows = []
+    if rows:
+        connection.execute(insert(Donation.__table__), rows)
+
+
+def measure(connection) -> float:
+    query = select(
+        Donation.id, Donation.full_amount, Donation.invested_amount
+    ).where(
+        Donation.fully_invested.is_(False)
+    ).order_by(Donation.create_date, Donation.id)
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        connection.execute(query).all()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def run(closed_rows: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(
+            f'sqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        )
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            seed(connection, closed_rows)
+        with engine.connect() as connection:
+            with_index = measure(connection)
+            connection.exec_driver_sql('DROP INDEX ix_donation_open_queue')
+            without_index = measure(connection)
+        engine.dispose()
+    print(
+        f'{closed_rows:>10} закрытых: '
+        f'с индексом {with_index:8.3f} мс, '
+        f'без индекса {without_index:8.3f} мс'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10000, 100000, 1000000]
+    )
+    for closed_rows in parser.parse_args().sizes:
+        run(closed_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""Бенчмарк выгрузки отчета в Google Sheets.
+
+Заполняет временную SQLite-базу закрытыми проектами и выгружает
+отчет в имитацию Sheets API (FakeSheets: проверяет размер листа
+и сериализует тела запросов в JSON, как клиент перед отправкой).
+Сравнивает потоковую выгрузку порциями (values.append) с загрузкой
+всего списка и одним запросом: время и пиковую память (tracemalloc).
+
+Запуск:
+    python -m benchmarks.report_export --rows 100000 --page-size 1000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.core.base import Base
+from app.core.db import make_engine
+from app.crud.projects import charity_project_crud
+from app.models import CharityProject
+from app.services.google_api import HEADER_ROW_COUNT, create_report
+
+
+class FakeRequest:
+    def __init__(self, path, kwargs):
+        self.path = path
+        self.kwargs = kwargs
+
+
+class FakeResource:
+    def __init__(self, path):
+        self._path = path
+
+    def __getattr__(self, name):
+        return FakeResource(f'{self._path}.{name}' if self._path else name)
+
+    def __call__(self, **kwargs):
+        return FakeRequest(self._path, kwargs)
+
+
+class FakeSheets:
+    """Имитация Google Sheets и Drive API для клиента Aiogoogle."""
+
+    def __init__(self):
+        self.requests = 0
+        self.request_bytes = 0
+        self.max_request_bytes = 0
+        self.row_count = 0
+        self.rows = 0
+
+    async def discover(self, api_name, api_version=None, validate=False):
+        return FakeResource('')
+
+    async def as_service_account(self, request):
+        self.requests += 1
+        size = len(json.dumps(request.kwargs, ensure_ascii=False, default=str))
+        self.request_bytes += size
+        self.max_request_bytes = max(self.max_request_bytes, size)
+        if request.path == 'spreadsheets.create':
+            sheet = request.kwargs['json']['sheets'][0]['properties']
+            self.row_count = sheet['gridProperties']['rowCount']
+            return {'spreadsheetId': 'fake'}
+        if request.path == 'spreadsheets.values.append':
+            self.rows += len(request.kwargs['json']['values'])
+            if HEADER_ROW_COUNT + self.rows > self.row_count:
+                raise ValueError('Строки не помещаются в лист.')
+        return {}
+
+
+async def seed(engine, rows: int) -> None:
+    start = datetime(2010, 1, 1)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await connection.execute(insert(CharityProject.__table__), [
+            {
+                'name': f'project {number}',
+                'description': 'Проект для бенчмарка',
+                'full_amount': 1000,
+                'invested_amount': 1000,
+                'fully_invested': True,
+                'create_date': start,
+                'close_date': start + timedelta(minutes=number),
+            }
+            for number in range(rows)
+        ])
+
+
+async def single_page(session):
+    yield await charity_project_crud.get_projects_by_completion_rate(session)
+
+
+async def export(session_factory, page_size: int, stream: bool):
+    sheets = FakeSheets()
+    async with session_factory() as session:
+        row_count = (
+            await charity_project_crud.count_projects_by_completion_rate(
+                session
+            )
+        )
+        pages = (
+            charity_project_crud.stream_projects_by_completion_rate(
+                session, chunk_size=page_size
+            ) if stream else single_page(session)
+        )
+        tracemalloc.start()
+        started = time.perf_counter()
+        await create_report(pages, row_count, sheets)
+        seconds = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return sheets, seconds, peak
+
+
+async def run(rows: int, page_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = make_engine(
+            f'sqlite+aiosqlite:///{os.path.join(tmp_dir, "bench.db")}'
+        )
+        await seed(engine, rows)
+        session_factory = sessionmaker(
+            engine, class_=AsyncSession, expire_on_commit=False
+        )
+        print(f'{rows} проектов, порция {page_size} строк:')
+        for title, stream in (('потоково', True), ('одним списком', False)):
+            sheets, seconds, peak = await export(
+                session_factory, page_size, stream
+            )
+            print(
+                f'  {title:<14} {seconds:7.2f} с, '
+                f'пик памяти {peak / 2 ** 20:7.1f} МБ, '
+                f'запросов {sheets.requests}, '
+                f'крупнейший {sheets.max_request_bytes / 2 ** 10:8.1f} КБ, '
+                f'строк {sheets.rows} из {sheets.row_count - HEADER_ROW_COUNT}'
+            )
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=1000)
+    arguments = parser.parse_args()
+    asyncio.run(run(arguments.rows, arguments.page_size))
@@ -0,0 +1,90 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from app.services.allocation import plan_allocation
+
+queues = st.lists(st.integers(min_value=1, max_value=10 ** 6), max_size=50)
+
+
+def reference_allocation(project_needs, donation_amounts):
+    """Исходный рекурсивный алгоритм: первый открытый проект
+    и первое открытое пожертвование обмениваются меньшей из
+    свободных сумм, закрытый объект выходит из очереди."""
+    projects = [[need, 0] for need in project_needs]
+    donations = [[amount, 0] for amount in donation_amounts]
+    transfers = []
+
+    def invest(project_index, donation_index):
+        if (project_index == len(projects) or
+                donation_index == len(donations)):
+            return
+        project = projects[project_index]
+        donation = donations[donation_index]
+        amount_project = project[0] - project[1]
+        amount_donation = donation[0] - donation[1]
+        if amount_project > amount_donation:
+            project[1] += amount_donation
+            donation[1] += amount_donation
+            if amount_donation:
+                transfers.append(
+                    (project_index, donation_index, amount_donation)
+                )
+            return invest(project_index, donation_index + 1)
+        project[1] += amount_project
+        donation[1] += amount_project
+        transfers.append((project_index, donation_index, amount_project))
+        return invest(project_index + 1, donation_index)
+
+    invest(0, 0)
+    return projects, donations, transfers
+
+
+def apply_plan(sizes, plan):
+    amounts = plan.amounts + [0] * (len(sizes) - len(plan.amounts))
+    return [
+        [size, amount] for size, amount in zip(sizes, amounts)
+    ], [number < plan.closed for number in range(len(sizes))]
+
+
+@given(queues, queues)
+def test_plan_matches_reference(project_needs, donation_amounts):
+    plan = plan_allocation(project_needs, donation_amounts)
+    projects, donations, transfers = reference_allocation(
+        project_needs, donation_amounts
+    )
+    planned_projects, closed_projects = apply_plan(
+        project_needs, plan.projects
+    )
+    planned_donations, closed_donations = apply_plan(
+        donation_amounts, plan.donations
+    )
+    assert planned_projects == projects, (
+        'Суммы, вложенные в проекты, должны совпадать '
+        'с исходным алгоритмом распределения.'
+    )
+    assert planned_donations == donations, (
+        'Распределенные суммы пожертвований должны совпадать '
+        'с исходным алгоритмом распределения.'
+    )
+    assert closed_projects == [
+        invested == need for need, invested in projects
+    ], 'Закрываться должны только полностью проинвестированные проекты.'
+    assert closed_donations == [
+        invested == amount for amount, invested in donations
+    ], 'Закрываться должны только полностью распределенные пожертвования.'
+    assert plan.total == sum(invested for _, invested in projects)
+    assert plan.transfers == transfers, (
+        'Переводы для журнала распределений должны совпадать '
+        'с шагами исходного алгоритма.'
+    )
+
+
+@given(queues)
+def test_plan_without_counterpart(sizes):
+    plan = plan_allocation(sizes, [])
+    assert plan.total == 0
+    assert plan.projects.closed == 0, (
+        'Без пожертвований проекты не должны закрываться.'
+    )
+    assert not any(plan.projects.amounts)
+    assert plan.transfers == []
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from conftest import TestingSessionLocal
+
+from app.core.config import settings
+from app.models import AllocationTask, CharityProject, Donation
+from app.schemas.charityproject import ProjectCreate
+from app.services.allocation_queue import AllocationQueue
+from app.services.investment import investment_service
+
+DONATIONS_URL = '/donation/'
+DONATION_STATUS_URL = DONATIONS_URL + '{donation_id}/status'
+
+
+@pytest.fixture
+def async_allocation(monkeypatch):
+    monkeypatch.setattr(settings, 'async_allocation', True)
+
+
+@pytest.mark.usefixtures('async_allocation')
+def test_donation_distributed_by_queue(user_client, charity_project):
+    response = user_client.post(DONATIONS_URL, json={'full_amount': 100})
+    assert response.status_code == 200, (
+        'В режиме отложенного распределения POST-запрос к эндпоинту '
+        f'`{DONATIONS_URL}` должен сразу возвращать созданное пожертвование.'
+    )
+    donation_id = response.json()['id']
+    status = user_client.get(
+        DONATION_STATUS_URL.format(donation_id=donation_id)).json()
+    assert not status['distributed'], (
+        'До обработки очереди пожертвование не должно считаться '
+        'распределенным.'
+    )
+
+    processed = asyncio.run(
+        AllocationQueue(TestingSessionLocal).drain_batch()
+    )
+    assert processed == 1
+    status = user_client.get(
+        DONATION_STATUS_URL.format(donation_id=donation_id)).json()
+    assert status['distributed'], (
+        'После обработки очереди пожертвование должно считаться '
+        'распределенным.'
+    )
+    assert status['fully_invested']
+    assert charity_project.invested_amount == 100
+
+
+def test_donation_status_foreign_donation(user_client, another_donation):
+    response = user_client.get(
+        DONATION_STATUS_URL.format(donation_id=another_donation.id))
+    assert response.status_code == 404, (
+        'Статус чужого пожертвования не должен быть доступен пользователю.'
+    )
+
+
+async def create_project_directly():
+    async with TestingSessionLocal() as session:
+        return await investment_service.create_project(
+            session, ProjectCreate(
+                name='cats', description='cats', full_amount=1000
+            )
+        )
+
+
+async def load(model, obj_id):
+    async with TestingSessionLocal() as session:
+        return await session.get(model, obj_id)
+
+
+@pytest.mark.usefixtures('async_allocation')
+def test_pending_donation_not_taken_by_project(user_client):
+    donation_id = user_client.post(
+        DONATIONS_URL, json={'full_amount': 100}
+    ).json()['id']
+    project = asyncio.run(create_project_directly())
+    assert project.invested_amount == 0, (
+        'Пожертвование, ожидающее фонового распределения, не должно '
+        'распределяться при создании проекта.'
+    )
+    asyncio.run(AllocationQueue(TestingSessionLocal).drain_batch())
+    donation = asyncio.run(load(Donation, donation_id))
+    project = asyncio.run(load(CharityProject, project.id))
+    assert donation.invested_amount == project.invested_amount == 100, (
+        'Пожертвование должно быть распределено ровно один раз.'
+    )
+
+
+@pytest.mark.usefixtures('async_allocation')
+def test_failing_task_does_not_block_queue(user_client, monkeypatch):
+    first_id, second_id = (
+        user_client.post(DONATIONS_URL, json={'full_amount': 100}).json()['id']
+        for _ in range(2)
+    )
+    distribute_donation = investment_service.distribute_donation
+
+    async def failing(session, donation_id):
+        if donation_id == first_id:
+            raise RuntimeError('сбой распределения')
+        return await distribute_donation(session, donation_id)
+
+    monkeypatch.setattr(investment_service, 'distribute_donation', failing)
+    queue = AllocationQueue(TestingSessionLocal)
+    assert asyncio.run(queue.drain_batch()) == 2
+    status = user_client.get(
+        DONATION_STATUS_URL.format(donation_id=second_id)).json()
+    assert status['distributed'], (
+        'Ошибка одной задачи не должна задерживать остальные.'
+    )
+    task = asyncio.run(load(AllocationTask, 1))
+    assert task.donation_id == first_id and task.attempts == 1
+    assert task.run_after is not None and 'сбой' in task.error
+    assert asyncio.run(queue.drain_batch()) == 0, (
+        'Задача после ошибки откладывается до run_after.'
+    )
+
+
+@pytest.mark.usefixtures('async_allocation')
+def test_exhausted_task_releases_donation(user_client, monkeypatch):
+    donation_id = user_client.post(
+        DONATIONS_URL, json={'full_amount': 100}
+    ).json()['id']
+
+    async def failing(session, donation_id):
+        raise RuntimeError('сбой распределения')
+
+    monkeypatch.setattr(investment_service, 'distribute_donation', failing)
+    monkeypatch.setattr(settings, 'allocation_max_attempts', 1)
+    assert asyncio.run(AllocationQueue(TestingSessionLocal).drain_batch()) == 1
+    assert asyncio.run(load(AllocationTask, 1)) is None, (
+        'После последней неудачной попытки задача должна удаляться.'
+    )
+    project = asyncio.run(create_project_directly())
+    assert project.invested_amount == 100, (
+        'Пожертвование, задача которого исчерпала попытки, должно '
+        'вернуться в открытую очередь.'
+    )
+    assert asyncio.run(load(Donation, donation_id)).fully_invested
@@ -728,3 +728,23 @@ def test_get_all_charity_project_not_auth_user(test_client):
         f'пользователя к эндпоинту `{PROJECTS_URL}` возвращается список '
         'существующих проектов.'
     )
+
+
+@pytest.mark.parametrize('names', [
+    ['chimichangas4life', 'nunchaku'],
+    ['nunchaku', 'nunchaku'],
+])
+def test_create_projects_batch_name_conflict(superuser_client,
+                                             charity_project, names):
+    response = superuser_client.post(PROJECTS_URL + 'batch', json=[
+        {'name': name, 'description': 'desc', 'full_amount': 100}
+        for name in names
+    ])
+    assert response.status_code == 400, (
+        'Пакет проектов с занятым или повторяющимся именем '
+        'должен возвращать ответ со статус-кодом 400.'
+    )
+    assert len(superuser_client.get(PROJECTS_URL).json()) == 1, (
+        'Если хотя бы одно имя в пакете недопустимо, '
+        'ни один проект не должен создаваться.'
+    )
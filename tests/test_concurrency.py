@@ -0,0 +1,168 @@
+import asyncio
+
+from conftest import TestingSessionLocal
+from sqlalchemy import func, insert, select
+
+from app.crud.fund_summary import fund_summary_crud
+from app.models import CharityProject, Donation, Investment
+from app.models.user import User
+from app.schemas.charityproject import ProjectCreate
+from app.schemas.donation import DonationCreate
+from app.services.investment import investment_service
+
+PARALLEL_DONATIONS = 2000
+MAX_IN_FLIGHT = 50
+DONATION_AMOUNT = 1500
+MIXED_DONATIONS = 300
+MIXED_PROJECTS = 30
+MIXED_DONATION_AMOUNT = 100
+
+user = User(
+    id=2,
+    is_active=True,
+    is_verified=True,
+    is_superuser=False,
+)
+
+
+async def create_user():
+    # Пожертвования ссылаются на пользователя внешним ключом,
+    # который PostgreSQL проверяет.
+    async with TestingSessionLocal() as session:
+        await session.execute(insert(User.__table__).values(
+            id=user.id, email='donor@example.com', hashed_password='',
+            is_active=True, is_verified=True, is_superuser=False,
+        ))
+        await session.commit()
+
+
+async def create_projects():
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            CharityProject(
+                name='chimichangas4life',
+                description='Huge fan of chimichangas. Wanna buy a lot',
+                full_amount=1000000,
+            ),
+            CharityProject(
+                name='nunchaku',
+                description='Nunchaku is better',
+                full_amount=5000000,
+            ),
+        ])
+        await session.commit()
+        await fund_summary_crud.rebuild(session)
+
+
+async def test_parallel_donations_keep_balance():
+    await create_user()
+    await create_projects()
+    in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+
+    async def donate():
+        async with in_flight, TestingSessionLocal() as session:
+            await investment_service.create_donat(
+                session, DonationCreate(full_amount=DONATION_AMOUNT), user
+            )
+
+    await asyncio.gather(*(donate() for _ in range(PARALLEL_DONATIONS)))
+
+    async with TestingSessionLocal() as session:
+        donations_invested = await session.scalar(
+            select(func.sum(Donation.invested_amount))
+        )
+        projects_invested = await session.scalar(
+            select(func.sum(CharityProject.invested_amount))
+        )
+        projects = (await session.execute(
+            select(CharityProject).order_by(CharityProject.id)
+        )).scalars().all()
+        open_donations = await session.scalar(
+            select(func.count(Donation.id)).where(
+                Donation.fully_invested.is_(False)
+            )
+        )
+    expected = PARALLEL_DONATIONS * DONATION_AMOUNT
+    assert donations_invested == projects_invested == expected, (
+        'При параллельном создании пожертвований сумма вложенных средств '
+        'в пожертвованиях и в проектах должна совпадать с суммой '
+        'всех пожертвований.'
+    )
+    assert projects[0].fully_invested, (
+        'Первый проект должен быть полностью проинвестирован.'
+    )
+    assert projects[1].invested_amount == expected - projects[0].full_amount
+    assert open_donations == 0, (
+        'Пока в проектах есть свободное место, пожертвования '
+        'не должны оставаться нераспределенными.'
+    )
+
+
+async def test_parallel_projects_and_donations_invest_once():
+    # Проекты и пожертвования создаются вперемешку: новое пожертвование
+    # может быть распределено созданием проекта раньше, чем запрос,
+    # который его создал, распределит его сам. На PostgreSQL
+    # (TEST_DATABASE_URL) без общей блокировки распределения такие
+    # транзакции пропускали бы строки друг друга или взаимно блокировались.
+    await create_user()
+    in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+    project_amount = (
+        MIXED_DONATIONS * MIXED_DONATION_AMOUNT // MIXED_PROJECTS
+    )
+
+    async def donate():
+        async with in_flight, TestingSessionLocal() as session:
+            await investment_service.create_donat(
+                session, DonationCreate(full_amount=MIXED_DONATION_AMOUNT),
+                user
+            )
+
+    async def create_project(number):
+        async with in_flight, TestingSessionLocal() as session:
+            await investment_service.create_project(session, ProjectCreate(
+                name=f'project {number}', description='project',
+                full_amount=project_amount,
+            ))
+
+    jobs = [donate() for _ in range(MIXED_DONATIONS)]
+    step = MIXED_DONATIONS // MIXED_PROJECTS
+    for number in range(MIXED_PROJECTS):
+        jobs.insert(number * (step + 1), create_project(number))
+    await asyncio.gather(*jobs)
+
+    async with TestingSessionLocal() as session:
+        donations_invested = await session.scalar(
+            select(func.sum(Donation.invested_amount))
+        )
+        projects_invested = await session.scalar(
+            select(func.sum(CharityProject.invested_amount))
+        )
+        ledger_invested = await session.scalar(
+            select(func.sum(Investment.amount))
+        )
+        overinvested = await session.scalar(
+            select(func.count(Donation.id)).where(
+                Donation.invested_amount > Donation.full_amount
+            )
+        )
+        open_objects = await session.scalar(
+            select(func.count(Donation.id)).where(
+                Donation.fully_invested.is_(False)
+            )
+        ) + await session.scalar(
+            select(func.count(CharityProject.id)).where(
+                CharityProject.fully_invested.is_(False)
+            )
+        )
+    expected = MIXED_DONATIONS * MIXED_DONATION_AMOUNT
+    assert donations_invested == projects_invested == ledger_invested == (
+        expected
+    ), (
+        'Каждое пожертвование должно распределяться ровно один раз, '
+        'даже если проект создается одновременно с ним.'
+    )
+    assert overinvested == 0
+    assert open_objects == 0, (
+        'Сумма проектов равна сумме пожертвований, все они должны '
+        'быть закрыты.'
+    )
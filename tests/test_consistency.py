@@ -0,0 +1,103 @@
+import asyncio
+
+from conftest import TestingSessionLocal
+from sqlalchemy import select
+
+from app.models import CharityProject, Donation
+from app.services.consistency import (INVESTED_OUT_OF_RANGE,
+                                      STALE_CLOSE_DATE, STALE_FULLY_INVESTED,
+                                      ConsistencyChecker)
+
+
+def run_checker(**kwargs):
+    return asyncio.run(
+        ConsistencyChecker(TestingSessionLocal, **kwargs).run()
+    )
+
+
+async def load(model):
+    async with TestingSessionLocal() as session:
+        return (await session.execute(
+            select(model).order_by(model.id)
+        )).scalars().all()
+
+
+def test_consistent_data(user_client, charity_project):
+    user_client.post('/donation/', json={'full_amount': 100})
+    report = run_checker(use_ledger=True)
+    assert report.consistent, (
+        'После штатного распределения нарушений быть не должно.'
+    )
+    assert report.ledger_invested_amount == 100
+
+
+def test_unbalanced_drift_repair_refused(mixer, charity_project):
+    mixer.blend(
+        'app.models.donation.Donation',
+        user_id=1, full_amount=100, invested_amount=150,
+        fully_invested=False, close_date=None,
+    )
+    report = run_checker()
+    donations = report.tables[1]
+    assert donations.violations == {
+        INVESTED_OUT_OF_RANGE: 1,
+        STALE_FULLY_INVESTED: 1,
+        STALE_CLOSE_DATE: 1,
+    }, 'Проверка должна находить все нарушения инвариантов строки.'
+    assert not report.balanced, (
+        'Расхождение сумм вложенных средств должно обнаруживаться.'
+    )
+    assert donations.repaired == 0, 'Без repair данные не изменяются.'
+
+    report = run_checker(repair=True)
+    assert report.repair_refused and report.tables[1].repaired == 0, (
+        'Ограничение суммы не сведет суммы проектов и пожертвований, '
+        'поэтому исправление должно отклоняться.'
+    )
+    donation = asyncio.run(load(Donation))[0]
+    assert donation.invested_amount == 150, (
+        'При отклоненном исправлении данные не должны меняться.'
+    )
+
+
+def test_balanced_drift_is_repaired(mixer,
+                                    charity_project_little_invested):
+    mixer.blend(
+        'app.models.donation.Donation',
+        user_id=1, full_amount=100, invested_amount=100,
+        fully_invested=False, close_date=None,
+    )
+    report = run_checker(repair=True)
+    assert not report.repair_refused
+    assert report.tables[1].repaired == 1
+    assert report.consistent, (
+        'Отчет после исправления должен строиться по исправленным данным.'
+    )
+    donation = asyncio.run(load(Donation))[0]
+    assert donation.fully_invested and donation.close_date is not None, (
+        'Пожертвование, вложенное полностью, должно быть закрыто.'
+    )
+
+
+def test_idle_donations_are_reallocated(mixer, charity_project):
+    mixer.blend(
+        'app.models.donation.Donation',
+        user_id=1, full_amount=300, invested_amount=0,
+        fully_invested=False, close_date=None,
+    )
+    report = run_checker()
+    assert report.idle_with_open_projects, (
+        'Свободные пожертвования при открытых проектах '
+        'должны обнаруживаться.'
+    )
+    report = run_checker(repair=True)
+    assert report.reallocated_amount == 300
+    assert not report.idle_with_open_projects, (
+        'Отчет после исправления описывает исправленные данные.'
+    )
+    project = asyncio.run(load(CharityProject))[0]
+    assert project.invested_amount == 300, (
+        'При исправлении свободные пожертвования должны '
+        'распределяться по открытым проектам.'
+    )
+    assert report.consistent
@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+from conftest import TestingSessionLocal, app, current_user
+from fixtures.user import superuser
+from sqlalchemy import select
+
+from app.core.versioning import project_version
+from app.models import CharityProject
+
+PROJECTS_URL = '/charity_project/'
+
+
+@pytest.fixture
+def admin_client(superuser_client):
+    # Фикстуры клиентов сбрасывают общие app.dependency_overrides,
+    # поэтому один клиент подменяет и current_user, и current_superuser.
+    app.dependency_overrides[current_user] = lambda: superuser
+    return superuser_client
+
+
+def assert_etag_changed(client, etag, action):
+    response = client.get(PROJECTS_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 200, (
+        f'{action} меняет проекты, поэтому старый ETag не должен совпадать.'
+    )
+    assert response.headers['etag'] != etag
+    return response
+
+
+def test_projects_etag(admin_client, charity_project):
+    response = admin_client.get(PROJECTS_URL)
+    etag = response.headers.get('etag')
+    assert etag, (
+        f'Ответ на GET-запрос к эндпоинту `{PROJECTS_URL}` '
+        'должен содержать заголовок ETag.'
+    )
+    assert response.headers.get('cache-control')
+    response = admin_client.get(
+        PROJECTS_URL, headers={'If-None-Match': etag}
+    )
+    assert response.status_code == 304, (
+        'Если версия проектов не изменилась, на запрос с If-None-Match '
+        'должен возвращаться ответ со статус-кодом 304.'
+    )
+    assert not response.content
+
+    response = admin_client.post(PROJECTS_URL, json={
+        'name': 'nunchaku',
+        'description': 'Nunchaku is better',
+        'full_amount': 100,
+    })
+    assert response.status_code == 200, response.json()
+    project_id = response.json()['id']
+    response = assert_etag_changed(admin_client, etag, 'Создание проекта')
+    assert len(response.json()) == 2
+
+    etag = response.headers['etag']
+    response = admin_client.post('/donation/', json={'full_amount': 100})
+    assert response.status_code == 200, response.json()
+    response = assert_etag_changed(
+        admin_client, etag, 'Распределение пожертвования'
+    )
+
+    etag = response.headers['etag']
+    response = admin_client.patch(
+        f'{PROJECTS_URL}{project_id}', json={'description': 'Changed'}
+    )
+    assert response.status_code == 200, response.json()
+    response = assert_etag_changed(admin_client, etag, 'Изменение проекта')
+
+    etag = response.headers['etag']
+    response = admin_client.post(f'{PROJECTS_URL}batch', json=[{
+        'name': 'katana',
+        'description': 'Katana is the best',
+        'full_amount': 100,
+    }])
+    assert response.status_code == 200, response.json()
+    response = assert_etag_changed(
+        admin_client, etag, 'Пакетное создание проектов'
+    )
+    assert len(response.json()) == 3
+
+    etag = response.headers['etag']
+    response = admin_client.delete(f'{PROJECTS_URL}{project_id}')
+    assert response.status_code == 200, response.json()
+    response = assert_etag_changed(admin_client, etag, 'Удаление проекта')
+    assert len(response.json()) == 2
+
+
+async def change_projects_in_other_process():
+    # CLI-команда или другой процесс uvicorn: своя сессия и commit.
+    async with TestingSessionLocal() as session:
+        project = (await session.execute(select(CharityProject))).scalar()
+        project.description = 'changed by another process'
+        project_version.touch(session)
+        await session.commit()
+
+
+def test_projects_etag_shared_between_processes(user_client,
+                                               charity_project):
+    response = user_client.get(PROJECTS_URL)
+    etag = response.headers['etag']
+    asyncio.run(change_projects_in_other_process())
+    response = user_client.get(PROJECTS_URL, headers={'If-None-Match': etag})
+    assert response.status_code == 200, (
+        'Версия проектов хранится в БД, поэтому изменение из другого '
+        'процесса должно менять ETag.'
+    )
+    assert response.json()[0]['description'] == (
+        'changed by another process'
+    )
+
+
+def test_projects_if_modified_since_ignored(user_client, charity_project):
+    response = user_client.get(PROJECTS_URL)
+    response = user_client.get(PROJECTS_URL, headers={
+        'If-Modified-Since': response.headers['last-modified'],
+    })
+    assert response.status_code == 200, (
+        'Дата с точностью до секунды не должна давать ответ 304.'
+    )
@@ -0,0 +1,18 @@
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.mark.parametrize('url', ['/charity_project/', '/donation/'])
+def test_orjson_responses_match_default(monkeypatch, superuser_client, url,
+                                        charity_project,
+                                        small_fully_charity_project,
+                                        donation, another_donation):
+    default = superuser_client.get(url)
+    monkeypatch.setattr(settings, 'orjson_responses', True)
+    fast = superuser_client.get(url)
+    assert fast.status_code == 200
+    assert fast.content == default.content, (
+        f'Ответ эндпоинта `{url}` в режиме orjson_responses должен '
+        'совпадать с обычным ответом байт в байт.'
+    )
@@ -0,0 +1,94 @@
+import os
+import time
+
+from aiogoogle.auth.creds import ServiceAccountCreds
+
+from app.core.google_client import GoogleClient
+from app.crud.cache import FileCache, LayeredCache, LocalCache
+
+
+class FakeSession:
+    """Заменяет HTTP: отдает документ discovery по URL запроса."""
+    instances = 0
+
+    def __init__(self):
+        FakeSession.instances += 1
+        self.urls = []
+        self.closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    async def send(self, *requests, **kwargs):
+        responses = []
+        for request in requests:
+            self.urls.append(request.url)
+            path = request.url.split('/apis/')[1]
+            api_name, api_version = path.split('/')[:2]
+            responses.append({
+                'kind': 'discovery#restDescription',
+                'name': api_name,
+                'version': api_version,
+                'rootUrl': 'https://fake.example.com/',
+                'servicePath': '',
+                'resources': {},
+            })
+        return responses[0] if len(responses) == 1 else responses
+
+
+def disk_cache(directory):
+    return LayeredCache(LocalCache(16, 60), FileCache(directory, 60))
+
+
+def make_client(discovery_cache):
+    return GoogleClient(
+        service_account_creds=ServiceAccountCreds(scopes=[]),
+        discovery_cache=discovery_cache,
+        session_class=FakeSession,
+    )
+
+
+async def test_discovery_documents_cached_in_memory():
+    FakeSession.instances = 0
+    client = make_client(LocalCache(16, 60))
+    for _ in range(2):
+        await client.discover('sheets', 'v4')
+        await client.discover('sheets', 'v4')
+        service = await client.discover('drive', 'v3')
+    assert service.discovery_document['name'] == 'drive'
+    assert client.discoveries == 2, (
+        'Каждый документ discovery должен загружаться один раз.'
+    )
+    assert FakeSession.instances == 1, (
+        'Все запросы должны идти через одну общую сессию.'
+    )
+    session = client._session
+    await client.close()
+    assert session.closed, 'close() должен закрывать общую сессию.'
+
+
+async def test_discovery_documents_cached_on_disk(tmpdir):
+    directory = str(tmpdir)
+    first = make_client(disk_cache(directory))
+    await first.discover('sheets', 'v4')
+    second = make_client(disk_cache(directory))
+    service = await second.discover('sheets', 'v4')
+    assert second.discoveries == 0, (
+        'После перезапуска документ должен читаться с диска.'
+    )
+    assert service.discovery_document['version'] == 'v4'
+
+    for name in os.listdir(directory):
+        expired = time.time() - 120
+        os.utime(os.path.join(directory, name), (expired, expired))
+    third = make_client(FileCache(directory, 60))
+    await third.discover('sheets', 'v4')
+    assert third.discoveries == 1, (
+        'Устаревший документ на диске должен загружаться заново.'
+    )
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from conftest import TestingSessionLocal
+from sqlalchemy import func, select
+
+from app.crud.fund_summary import fund_summary_crud
+from app.models import CharityProject, Donation, User
+
+IMPORT_URL = '/donation/import'
+STATS_URL = '/stats/'
+
+VALID_CSV = (
+    'full_amount,comment,create_date\n'
+    '600000,first,2010-10-11T00:00:00\n'
+    '700000,,2010-10-12T00:00:00\n'
+    '100,last,\n'
+)
+INVALID_CSV = (
+    'full_amount,comment\n'
+    '100,ok\n'
+    '-5,negative\n'
+    'abc,not a number\n'
+)
+
+
+@pytest.fixture(autouse=True)
+def superuser_in_db(mixer):
+    # Импорт проверяет, что пользователи из файла есть в БД;
+    # строки без user_id получают id суперюзера, выполняющего импорт.
+    return mixer.blend(User, id=1, email='super@user.com')
+
+
+async def totals():
+    async with TestingSessionLocal() as session:
+        donations = await session.scalar(select(func.count(Donation.id)))
+        invested = await session.scalar(
+            select(func.sum(CharityProject.invested_amount))
+        )
+        return donations, invested, await fund_summary_crud.scan(session)
+
+
+def upload(client, content, **params):
+    return client.post(
+        IMPORT_URL,
+        params=params,
+        files={'file': ('donations.csv', content.encode(), 'text/csv')},
+    )
+
+
+def test_import_allocates_donations(superuser_client, charity_project):
+    response = upload(superuser_client, VALID_CSV)
+    assert response.status_code == 200, (
+        f'POST-запрос к эндпоинту `{IMPORT_URL}` с корректным файлом '
+        'должен вернуть ответ со статус-кодом 200.'
+    )
+    report = response.json()
+    assert (report['rows'], report['donated_amount'],
+            report['invested_amount']) == (3, 1300100, 1000000), (
+        'Отчет об импорте должен содержать число строк, сумму '
+        'пожертвований и распределенную сумму.'
+    )
+    donations, invested, actual = asyncio.run(totals())
+    assert (donations, invested) == (3, 1000000), (
+        'Импортированные пожертвования должны распределяться по проектам.'
+    )
+    stats = superuser_client.get(STATS_URL).json()
+    assert {field: stats[field] for field in actual} == actual, (
+        'После импорта сводка фонда должна совпадать с полным пересчетом.'
+    )
+
+
+def test_import_dry_run(superuser_client, charity_project):
+    response = upload(superuser_client, VALID_CSV, dry_run=True)
+    assert response.status_code == 200
+    assert response.json()['rows'] == 3
+    assert asyncio.run(totals())[:2] == (0, 0), (
+        'При dry_run пожертвования не должны сохраняться.'
+    )
+
+
+def test_import_invalid_rows(superuser_client, charity_project):
+    response = upload(superuser_client, INVALID_CSV)
+    assert response.status_code == 400, (
+        'Файл с ошибками должен возвращать ответ со статус-кодом 400.'
+    )
+    assert [error['line'] for error in response.json()['errors']] == [3, 4], (
+        'В отчете должны быть указаны номера строк с ошибками.'
+    )
+    assert asyncio.run(totals())[0] == 0, (
+        'Если в файле есть ошибки, ничего не должно импортироваться.'
+    )
+
+
+def test_import_forbidden_for_user(user_client):
+    response = upload(user_client, VALID_CSV)
+    assert response.status_code in (401, 403), (
+        'Импорт пожертвований доступен только суперюзерам.'
+    )
+
+
+def test_import_unknown_user(superuser_client, charity_project):
+    response = upload(superuser_client, (
+        'full_amount,user_id\n'
+        '100,1\n'
+        '200,999\n'
+        '300,\n'
+    ))
+    assert response.status_code == 400, (
+        'Строки с несуществующим user_id должны считаться ошибками.'
+    )
+    errors = response.json()['errors']
+    assert [error['line'] for error in errors] == [3]
+    assert '999' in errors[0]['error']
+    assert asyncio.run(totals())[0] == 0
+
+
+def test_import_extra_fields(superuser_client, charity_project):
+    response = upload(superuser_client, (
+        'full_amount,comment\n'
+        '100,ok\n'
+        '200,too,many,fields\n'
+    ))
+    assert response.status_code == 400, (
+        'Строка, в которой больше полей, чем в заголовке, должна '
+        'считаться ошибкой, а не приводить к ошибке сервера.'
+    )
+    assert [error['line'] for error in response.json()['errors']] == [3]
+    assert asyncio.run(totals())[0] == 0
+
+
+def test_import_not_utf8(superuser_client, charity_project):
+    response = superuser_client.post(IMPORT_URL, files={
+        'file': (
+            'donations.csv',
+            'full_amount,comment\n100,пожертвование\n'.encode('cp1251'),
+            'text/csv',
+        ),
+    })
+    assert response.status_code == 400, (
+        'Файл не в кодировке UTF-8 должен возвращать ответ '
+        'со статус-кодом 400, а не ошибку сервера.'
+    )
+    assert response.json()['errors']
+    assert asyncio.run(totals())[0] == 0
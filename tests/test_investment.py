@@ -1,5 +1,9 @@
+import json
+
 import pytest
 
+from app.core.constants import NDJSON_MEDIA_TYPE
+
 DONATION_URL = '/donation/'
 PROJECTS_URL = '/charity_project/'
 
@@ -60,3 +64,81 @@ def test_donation_to_little_invest_project(
     )
     assert not charity_project_nunchaku.fully_invested, common_asser_msg
     assert charity_project_nunchaku.invested_amount == 0, common_asser_msg
+
+
+
+def test_raised_full_amount_takes_idle_donations(
+        superuser_client, charity_project_little_invested, donation
+):
+    common_asser_msg = (
+        'При тестировании создан частично инвестированный проект '
+        'и свободное пожертвование. После увеличения требуемой суммы '
+        'проекта пожертвование должно распределиться в этот проект.'
+    )
+    response = superuser_client.patch(
+        PROJECTS_URL + str(charity_project_little_invested.id),
+        json={'full_amount': 1000050},
+    )
+    assert response.status_code == 200, common_asser_msg
+    data = response.json()
+    assert data['invested_amount'] == 200, common_asser_msg
+    assert not data['fully_invested'], common_asser_msg
+    assert donation.fully_invested, common_asser_msg
+
+
+def test_projects_batch_takes_idle_donations(
+        superuser_client, donation, another_donation
+):
+    common_asser_msg = (
+        'При тестировании созданы два свободных пожертвования на 2100. '
+        'Пакет из трех проектов должен забрать их в порядке очереди: '
+        'первый проект закрывается, второй получает остаток, '
+        'третий остается пустым.'
+    )
+    response = superuser_client.post(PROJECTS_URL + 'batch', json=[
+        {'name': 'first', 'description': 'first', 'full_amount': 1000},
+        {'name': 'second', 'description': 'second', 'full_amount': 5000},
+        {'name': 'third', 'description': 'third', 'full_amount': 10},
+    ])
+    assert response.status_code == 200, common_asser_msg
+    data = response.json()
+    assert [project['name'] for project in data] == [
+        'first', 'second', 'third'
+    ], 'Проекты должны возвращаться в порядке создания.'
+    assert [project['invested_amount'] for project in data] == [
+        1000, 1100, 0
+    ], common_asser_msg
+    assert [project['fully_invested'] for project in data] == [
+        True, False, False
+    ], common_asser_msg
+    assert donation.fully_invested, common_asser_msg
+    assert another_donation.fully_invested, common_asser_msg
+
+
+def test_donation_investments_trail(
+        user_client, charity_project_little_invested, charity_project_nunchaku
+):
+    response = user_client.post(DONATION_URL, json={'full_amount': 1000000})
+    donation_id = response.json()['id']
+    response = user_client.get(f'{DONATION_URL}{donation_id}/investments')
+    assert response.status_code == 200, (
+        'Журнал распределений собственного пожертвования '
+        'должен быть доступен пользователю.'
+    )
+    trail = [json.loads(line) for line in response.text.splitlines()]
+    assert [
+        (entry['project_id'], entry['amount']) for entry in trail
+    ] == [
+        (charity_project_little_invested.id, 999900),
+        (charity_project_nunchaku.id, 100),
+    ], (
+        'Журнал распределений должен содержать переводы в проекты '
+        'в порядке очереди.'
+    )
+    assert response.headers['content-type'] == NDJSON_MEDIA_TYPE
+    operation = user_client.get('/openapi.json').json()['paths'][
+        DONATION_URL + '{donation_id}/investments'
+    ]['get']
+    assert list(operation['responses']['200']['content']) == [
+        NDJSON_MEDIA_TYPE
+    ], 'В схеме OpenAPI журнал распределений должен быть описан как NDJSON.'
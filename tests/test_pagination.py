@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+PROJECTS_URL = '/charity_project/'
+DONATIONS_URL = '/donation/'
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_projects_keyset_pagination(user_client):
+    first_page = user_client.get(PROJECTS_URL, params={'limit': 1}).json()
+    assert [project['name'] for project in first_page] == [
+        'chimichangas4life'
+    ], (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}` с параметром `limit` '
+        'должен возвращать не больше `limit` проектов в порядке создания.'
+    )
+    second_page = user_client.get(
+        PROJECTS_URL,
+        params={'limit': 1, 'after_id': first_page[-1]['id']},
+    ).json()
+    assert [project['name'] for project in second_page] == ['nunchaku'], (
+        f'GET-запрос к эндпоинту `{PROJECTS_URL}` с параметром `after_id` '
+        'должен возвращать проекты, созданные после указанного.'
+    )
+    last_page = user_client.get(
+        PROJECTS_URL,
+        params={'limit': 1, 'after_id': second_page[-1]['id']},
+    ).json()
+    assert last_page == []
+
+
+@pytest.mark.usefixtures('charity_project', 'charity_project_nunchaku')
+def test_projects_stream_matches_list(user_client):
+    response = user_client.get(PROJECTS_URL, params={'stream': True})
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == user_client.get(PROJECTS_URL).json(), (
+        f'Потоковый ответ эндпоинта `{PROJECTS_URL}` должен содержать '
+        'те же проекты, что и обычный список.'
+    )
+
+
+@pytest.mark.usefixtures('donation', 'another_donation')
+def test_donations_stream_matches_list(superuser_client):
+    response = superuser_client.get(DONATIONS_URL, params={'stream': True})
+    streamed = [json.loads(line) for line in response.text.splitlines()]
+    assert streamed == superuser_client.get(DONATIONS_URL).json(), (
+        f'Потоковый ответ эндпоинта `{DONATIONS_URL}` должен содержать '
+        'те же пожертвования, что и обычный список.'
+    )
+
+
+@pytest.mark.usefixtures('another_donation')
+def test_my_donations_date_filter(user_client, donation):
+    url = DONATIONS_URL + 'my'
+    in_range = user_client.get(url, params={
+        'created_from': '2011-11-01T00:00:00',
+        'created_to': '2011-12-01T00:00:00',
+    }).json()
+    assert [item['id'] for item in in_range] == [donation.id], (
+        f'GET-запрос к эндпоинту `{url}` с фильтром по дате должен '
+        'возвращать пожертвования пользователя из указанного интервала.'
+    )
+    out_of_range = user_client.get(url, params={
+        'created_from': '2011-12-01T00:00:00',
+    }).json()
+    assert out_of_range == []
+    after_last = user_client.get(url, params={
+        'limit': 10, 'after_id': donation.id,
+    }).json()
+    assert after_last == []
@@ -0,0 +1,51 @@
+import asyncio
+
+from app.core.password import ExecutorPasswordHelper
+
+
+def test_hash_and_verify_in_executor():
+    helper = ExecutorPasswordHelper(workers=2, concurrency=2)
+
+    async def run():
+        hashed = await helper.hash_async('chimichangas4life')
+        return (
+            await helper.verify_and_update_async('chimichangas4life', hashed),
+            await helper.verify_and_update_async('wrong', hashed),
+        )
+
+    (verified, _), (wrong, _) = asyncio.run(run())
+    helper.shutdown()
+    assert verified and not wrong, (
+        'Пароль, захешированный в пуле, должен проверяться '
+        'так же, как при синхронном хешировании.'
+    )
+
+
+def test_concurrency_limit_and_metrics():
+    helper = ExecutorPasswordHelper(workers=4, concurrency=1)
+
+    async def run():
+        return await asyncio.gather(
+            *(helper.hash_async(f'password{number}') for number in range(3))
+        )
+
+    hashes = asyncio.run(run())
+    metrics = helper.metrics()
+    helper.shutdown()
+    assert len(set(hashes)) == 3
+    assert metrics['completed'] == 3
+    assert metrics['max_waiting'] == 2, (
+        'При concurrency=1 первая задача выполняется сразу, '
+        'остальные должны ждать в очереди.'
+    )
+    assert metrics['waiting'] == metrics['running'] == 0
+    assert metrics['avg_run_seconds'] > 0
+
+
+def test_inline_executor():
+    helper = ExecutorPasswordHelper(executor='inline')
+    hashed = asyncio.run(helper.hash_async('chimichangas4life'))
+    assert helper.verify_and_update('chimichangas4life', hashed)[0]
+    assert helper.metrics()['completed'] == 0, (
+        'В режиме inline пул и очередь не используются.'
+    )
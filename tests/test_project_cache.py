@@ -0,0 +1,179 @@
+import asyncio
+import json
+from datetime import datetime
+
+import pytest
+from conftest import TestingSessionLocal
+from sqlalchemy import update
+
+from app.crud.cache import LocalCache, RedisCache
+from app.crud.projects import charity_project_crud
+from app.models import CharityProject
+
+PROJECT_DETAILS_URL = '/charity_project/{project_id}'
+
+
+@pytest.fixture
+def project_cache(monkeypatch):
+    monkeypatch.setattr(charity_project_crud, 'cache', LocalCache(100, 60))
+    monkeypatch.setattr(charity_project_crud, 'cache_hits', 0)
+    monkeypatch.setattr(charity_project_crud, 'cache_misses', 0)
+    return charity_project_crud
+
+
+async def get_project(project_id):
+    async with TestingSessionLocal() as session:
+        return await charity_project_crud.get(project_id, session)
+
+
+async def find_project(name):
+    async with TestingSessionLocal() as session:
+        return await charity_project_crud.found_charity_project_by_name(
+            name, session
+        )
+
+
+def test_cache_hits_and_misses(project_cache, charity_project):
+    first = asyncio.run(get_project(charity_project.id))
+    second = asyncio.run(get_project(charity_project.id))
+    assert (project_cache.cache_misses, project_cache.cache_hits) == (1, 1), (
+        'Повторный поиск проекта по id должен обслуживаться из кэша.'
+    )
+    assert second.name == first.name == charity_project.name
+    assert asyncio.run(find_project(charity_project.name)).id == first.id
+    assert project_cache.cache_hits == 2, (
+        'Поиск по имени должен использовать тот же кэш.'
+    )
+
+
+def test_allocation_invalidates_cache(project_cache, user_client,
+                                      charity_project):
+    asyncio.run(get_project(charity_project.id))
+    user_client.post('/donation/', json={'full_amount': 100})
+    project = asyncio.run(get_project(charity_project.id))
+    assert project.invested_amount == 100, (
+        'После распределения пожертвования проект должен '
+        'удаляться из кэша.'
+    )
+
+
+def test_free_name_is_cached(project_cache, superuser_client):
+    assert asyncio.run(find_project('nunchaku')) is None
+    assert asyncio.run(find_project('nunchaku')) is None
+    assert project_cache.cache_hits == 1, (
+        'Отсутствие проекта с таким именем тоже должно кэшироваться.'
+    )
+    response = superuser_client.post('/charity_project/', json={
+        'name': 'nunchaku',
+        'description': 'Nunchaku is better',
+        'full_amount': 100,
+    })
+    assert response.status_code == 200
+    assert asyncio.run(find_project('nunchaku')).id == response.json()['id'], (
+        'После создания проекта имя не должно считаться свободным.'
+    )
+    response = superuser_client.post('/charity_project/', json={
+        'name': 'nunchaku',
+        'description': 'Nunchaku is better',
+        'full_amount': 100,
+    })
+    assert response.status_code == 400
+
+
+def test_update_invalidates_cache(project_cache, superuser_client,
+                                  charity_project):
+    asyncio.run(find_project(charity_project.name))
+    assert asyncio.run(find_project('nunchaku')) is None
+    response = superuser_client.patch(
+        PROJECT_DETAILS_URL.format(project_id=charity_project.id),
+        json={'name': 'nunchaku'},
+    )
+    assert response.status_code == 200
+    assert asyncio.run(find_project(charity_project.name)) is None, (
+        'После переименования старое имя не должно находиться в кэше.'
+    )
+    assert asyncio.run(find_project('nunchaku')).id == charity_project.id
+
+
+def test_delete_cached_project(project_cache, superuser_client,
+                               charity_project):
+    asyncio.run(get_project(charity_project.id))
+    response = superuser_client.delete(
+        PROJECT_DETAILS_URL.format(project_id=charity_project.id)
+    )
+    assert response.status_code == 200, (
+        'Проект из кэша должен удаляться так же, как загруженный из БД.'
+    )
+    assert asyncio.run(get_project(charity_project.id)) is None
+
+
+async def invest_behind_cache(project_id, amount):
+    # Изменение из другого процесса: кэш этого процесса не очищается.
+    async with TestingSessionLocal() as session:
+        await session.execute(
+            update(CharityProject).where(
+                CharityProject.id == project_id
+            ).values(invested_amount=amount)
+        )
+        await session.commit()
+
+
+def test_delete_checks_database_not_cache(project_cache, superuser_client,
+                                          charity_project):
+    asyncio.run(get_project(charity_project.id))
+    asyncio.run(invest_behind_cache(charity_project.id, 100))
+    assert asyncio.run(get_project(charity_project.id)).invested_amount == 0
+    response = superuser_client.delete(
+        PROJECT_DETAILS_URL.format(project_id=charity_project.id)
+    )
+    assert response.status_code == 400, (
+        'Проверка перед удалением должна читать проект из БД, '
+        'а не из кэша.'
+    )
+
+
+async def remove_stale(project_id):
+    async with TestingSessionLocal() as session:
+        stale = await charity_project_crud.get(project_id, session)
+        await invest_behind_cache(project_id, 100)
+        removed = await charity_project_crud.remove(stale, session)
+    async with TestingSessionLocal() as session:
+        exists = await charity_project_crud.get(
+            project_id, session, use_cache=False
+        )
+    return removed, exists
+
+
+def test_remove_is_conditional(charity_project):
+    removed, exists = asyncio.run(remove_stale(charity_project.id))
+    assert removed is None and exists is not None, (
+        'Проект с вложенными средствами не должен удаляться, даже если '
+        'проверка прошла по устаревшим данным.'
+    )
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+
+def test_redis_cache_stores_json():
+    client = FakeRedis()
+    cache = RedisCache(client, ttl=60)
+    value = {'id': 1, 'create_date': datetime(2010, 10, 10, 12, 30)}
+    asyncio.run(cache.set('project', value))
+    json.loads(client.values['cache:project'])
+    assert asyncio.run(cache.get('project')) == value, (
+        'Значения общего кэша хранятся в JSON и читаются без потерь, '
+        'включая даты.'
+    )
@@ -0,0 +1,194 @@
+import asyncio
+
+import pytest
+from conftest import TestingSessionLocal
+
+from app.core.config import settings
+from app.crud.report_jobs import report_job_crud
+from app.services.report_jobs import ReportQueue
+
+REPORT_URL = '/google/'
+REPORT_JOB_URL = REPORT_URL + '{job_id}'
+
+
+class FakeReport:
+    """Заменяет Google API: падает failures раз, затем создает
+    документ."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    async def __call__(self, pages, row_count):
+        projects = [project async for page in pages for project in page]
+        assert len(projects) == row_count
+        self.calls.append(projects)
+        if len(self.calls) <= self.failures:
+            raise RuntimeError('Google API недоступен')
+        return f'sheet-{len(self.calls)}'
+
+
+def run_due(build_report):
+    return asyncio.run(
+        ReportQueue(TestingSessionLocal, build_report).run_due()
+    )
+
+
+def test_report_job_done(superuser_client):
+    response = superuser_client.post(REPORT_URL, params={'limit': 5})
+    assert response.status_code == 202, (
+        f'POST-запрос к эндпоинту `{REPORT_URL}` должен сразу '
+        'возвращать задачу со статусом 202.'
+    )
+    job = response.json()
+    assert job['status'] == 'pending'
+    assert job['project_limit'] == 5
+    assert job['spreadsheet_url'] is None
+
+    build_report = FakeReport()
+    assert run_due(build_report) == 1
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job['id'])).json()
+    assert job['status'] == 'done', (
+        'После обработки очереди задача должна быть выполнена.'
+    )
+    assert job['spreadsheet_url'] == (
+        'https://docs.google.com/spreadsheets/d/sheet-1'
+    )
+    assert job['attempts'] == 1 and job['finish_date'] is not None
+    assert run_due(build_report) == 0, (
+        'Выполненная задача не должна запускаться повторно.'
+    )
+
+
+def test_report_job_retried_with_backoff(superuser_client):
+    job_id = superuser_client.post(REPORT_URL).json()['id']
+    build_report = FakeReport(failures=1)
+    run_due(build_report)
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job_id)).json()
+    assert job['status'] == 'pending' and job['attempts'] == 1, (
+        'После ошибки задача должна вернуться в очередь.'
+    )
+    assert 'Google API недоступен' in job['error']
+    assert run_due(build_report) == 0, (
+        'Повторная попытка не должна запускаться до истечения задержки.'
+    )
+
+
+def test_report_job_retry_succeeds(superuser_client, monkeypatch):
+    monkeypatch.setattr(settings, 'report_retry_delay', 0)
+    job_id = superuser_client.post(REPORT_URL).json()['id']
+    build_report = FakeReport(failures=1)
+    run_due(build_report)
+    run_due(build_report)
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job_id)).json()
+    assert job['status'] == 'done' and job['attempts'] == 2, (
+        'Повторная попытка после ошибки должна выполнить задачу.'
+    )
+    assert job['error'] is None
+
+
+def test_report_job_failed(superuser_client, monkeypatch):
+    monkeypatch.setattr(settings, 'report_max_attempts', 2)
+    monkeypatch.setattr(settings, 'report_retry_delay', 0)
+    job_id = superuser_client.post(REPORT_URL).json()['id']
+    build_report = FakeReport(failures=10)
+    run_due(build_report)
+    run_due(build_report)
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job_id)).json()
+    assert job['status'] == 'failed', (
+        'После report_max_attempts неудачных попыток задача '
+        'должна получить статус failed.'
+    )
+    assert job['attempts'] == 2
+    assert run_due(build_report) == 0
+
+
+@pytest.mark.parametrize('concurrency', [1, 2])
+def test_report_concurrency(superuser_client, monkeypatch, concurrency):
+    monkeypatch.setattr(settings, 'report_concurrency', concurrency)
+    for _ in range(3):
+        superuser_client.post(REPORT_URL)
+    assert run_due(FakeReport()) == concurrency, (
+        'За один проход выполняется не больше report_concurrency задач.'
+    )
+
+
+def test_report_job_not_found(superuser_client):
+    response = superuser_client.get(REPORT_JOB_URL.format(job_id=100))
+    assert response.status_code == 404
+
+
+def test_report_forbidden_for_user(user_client):
+    response = user_client.post(REPORT_URL)
+    assert response.status_code == 403
+
+
+async def claim():
+    async with TestingSessionLocal() as session:
+        return await report_job_crud.claim_due(1, session)
+
+
+def claim_expired(monkeypatch):
+    monkeypatch.setattr(settings, 'report_lease_seconds', -1)
+    job_ids = asyncio.run(claim())
+    monkeypatch.setattr(settings, 'report_lease_seconds', 60)
+    return job_ids
+
+
+def test_live_job_not_requeued(superuser_client):
+    job_id = superuser_client.post(REPORT_URL).json()['id']
+    assert asyncio.run(claim()) == [job_id]
+    # Второй процесс запускает обработчик, пока первый выполняет задачу.
+    assert run_due(FakeReport()) == 0, (
+        'Задача, аренду которой продлевает другой обработчик, '
+        'не должна возвращаться в очередь и выполняться повторно.'
+    )
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job_id)).json()
+    assert job['status'] == 'running'
+
+
+def test_expired_job_requeued(superuser_client, monkeypatch):
+    job_id = superuser_client.post(REPORT_URL).json()['id']
+    assert claim_expired(monkeypatch) == [job_id]
+    build_report = FakeReport()
+    assert run_due(build_report) == 1, (
+        'Задача с истекшей арендой должна возвращаться в очередь.'
+    )
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job_id)).json()
+    assert job['status'] == 'done' and job['attempts'] == 2
+
+
+async def finish_stale_attempt(job_id):
+    async with TestingSessionLocal() as session:
+        return await report_job_crud.set_result(
+            job_id, 1, session, status='done', spreadsheet_id='stale'
+        )
+
+
+def test_stale_attempt_result_ignored(superuser_client, monkeypatch):
+    job_id = superuser_client.post(REPORT_URL).json()['id']
+    claim_expired(monkeypatch)
+    run_due(FakeReport())
+    assert not asyncio.run(finish_stale_attempt(job_id)), (
+        'Попытка, потерявшая аренду, не должна записывать результат.'
+    )
+    job = superuser_client.get(REPORT_JOB_URL.format(job_id=job_id)).json()
+    assert job['spreadsheet_url'].endswith('sheet-1')
+
+
+def test_report_projects_full_objects(superuser_client,
+                                      small_fully_charity_project,
+                                      charity_project):
+    response = superuser_client.get(REPORT_URL + 'projects')
+    assert response.status_code == 200
+    projects = response.json()
+    assert [project['name'] for project in projects] == [
+        small_fully_charity_project.name
+    ], 'В список попадают только закрытые проекты.'
+    assert {
+        'id', 'name', 'description', 'full_amount', 'invested_amount',
+        'fully_invested', 'create_date', 'close_date',
+    } <= projects[0].keys(), (
+        'Проекты отчета должны возвращаться со всеми полями, '
+        'как раньше в ответе POST /google/.'
+    )
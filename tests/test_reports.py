@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from conftest import TestingSessionLocal
+
+from app.crud.projects import charity_project_crud
+from app.models import CharityProject
+from app.services.google_api import create_report
+
+
+def closed_project(name, create_date, close_date):
+    return CharityProject(
+        name=name,
+        description=f'{name} description',
+        full_amount=100,
+        invested_amount=100,
+        fully_invested=True,
+        create_date=create_date,
+        close_date=close_date,
+    )
+
+
+async def test_projects_ordered_by_completion_rate():
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            closed_project(
+                'slow', datetime(2010, 1, 1), datetime(2010, 3, 1)),
+            closed_project(
+                'fast', datetime(2010, 2, 1), datetime(2010, 2, 1, 12)),
+            closed_project(
+                'medium', datetime(2010, 1, 1), datetime(2010, 1, 10)),
+            CharityProject(
+                name='open', description='open', full_amount=100),
+        ])
+        await session.commit()
+        projects = await charity_project_crud.get_projects_by_completion_rate(
+            session
+        )
+        top = await charity_project_crud.get_projects_by_completion_rate(
+            session, limit=2
+        )
+    assert [project.name for project in projects] == [
+        'fast', 'medium', 'slow'
+    ], (
+        'Закрытые проекты должны быть отсортированы по времени сбора '
+        'средств; открытые проекты в отчет не попадают.'
+    )
+    assert [project.name for project in top] == ['fast', 'medium']
+
+
+class FakeResource:
+    """Ресурс API: service.spreadsheets.values.append(...) возвращает
+    имя метода и аргументы."""
+
+    def __init__(self, name=''):
+        self.name = name
+
+    def __getattr__(self, name):
+        return FakeResource(name)
+
+    def __call__(self, **kwargs):
+        return self.name, kwargs
+
+
+class FakeSheets:
+    """Заменяет Aiogoogle: запоминает запросы к Sheets и Drive."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def discover(self, api_name, api_version=None, validate=False):
+        return FakeResource()
+
+    async def as_service_account(self, request):
+        self.requests.append(request)
+        return {'spreadsheetId': 'sheet'}
+
+
+async def test_report_written_in_pages():
+    start = datetime(2010, 1, 1)
+    async with TestingSessionLocal() as session:
+        session.add_all([
+            closed_project(
+                f'project {number}', start,
+                start + timedelta(days=number + 1)
+            )
+            for number in range(5)
+        ])
+        await session.commit()
+        row_count = (
+            await charity_project_crud.count_projects_by_completion_rate(
+                session
+            )
+        )
+        pages = charity_project_crud.stream_projects_by_completion_rate(
+            session, chunk_size=2
+        )
+        sheets = FakeSheets()
+        await create_report(pages, row_count, sheets)
+    create, _, header, *appends = sheets.requests
+    grid = create[1]['json']['sheets'][0]['properties']['gridProperties']
+    assert grid['rowCount'] == 3 + 5, (
+        'Размер листа должен зависеть от количества проектов.'
+    )
+    assert len(header[1]['json']['values']) == 3
+    assert [name for name, _ in appends] == ['append'] * 3, (
+        'Проекты должны записываться порциями через values.append.'
+    )
+    rows = [
+        row for _, kwargs in appends for row in kwargs['json']['values']
+    ]
+    assert [row[0] for row in rows] == [
+        f'project {number}' for number in range(5)
+    ]
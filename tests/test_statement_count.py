@@ -0,0 +1,52 @@
+from contextlib import contextmanager
+
+from conftest import engine
+from sqlalchemy import event
+
+PROJECT_DETAILS_URL = '/charity_project/{project_id}'
+PATCH_MAX_STATEMENTS = 3
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(connection, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(
+        engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+    )
+    try:
+        yield statements
+    finally:
+        event.remove(
+            engine.sync_engine, 'before_cursor_execute', before_cursor_execute
+        )
+
+
+def test_patch_project_statement_count(superuser_client, charity_project):
+    url = PROJECT_DETAILS_URL.format(project_id=charity_project.id)
+    with count_statements() as statements:
+        response = superuser_client.patch(url, json={
+            'name': 'nunchaku4life',
+            'description': 'Nunchaku is better',
+        })
+    assert response.status_code == 200
+    assert response.json()['name'] == 'nunchaku4life'
+    assert len(statements) <= PATCH_MAX_STATEMENTS, (
+        f'PATCH-запрос к эндпоинту `{PROJECT_DETAILS_URL}` должен '
+        f'выполнять не более {PATCH_MAX_STATEMENTS} SQL-запросов: '
+        'загрузка проекта с проверкой имени, UPDATE проекта '
+        'и увеличение версии проектов. '
+        'Выполнено:\n' + '\n'.join(statements)
+    )
+
+
+def test_patch_project_name_taken(superuser_client, charity_project,
+                                  charity_project_nunchaku):
+    response = superuser_client.patch(
+        PROJECT_DETAILS_URL.format(project_id=charity_project.id),
+        json={'name': charity_project_nunchaku.name},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,66 @@
+import asyncio
+
+from conftest import TestingSessionLocal
+
+from app.crud.fund_summary import fund_summary_crud
+
+DONATIONS_URL = '/donation/'
+STATS_URL = '/stats/'
+
+
+async def scan():
+    async with TestingSessionLocal() as session:
+        return await fund_summary_crud.scan(session)
+
+
+def test_stats_follow_allocations(user_client, charity_project,
+                                  charity_project_nunchaku):
+    user_client.post(DONATIONS_URL, json={'full_amount': 600000})
+    user_client.post(DONATIONS_URL, json={'full_amount': 700000})
+    response = user_client.get(STATS_URL)
+    assert response.status_code == 200, (
+        f'GET-запрос к эндпоинту `{STATS_URL}` должен вернуть ответ '
+        'со статус-кодом 200.'
+    )
+    assert response.json() == {
+        'donated_amount': 1300000,
+        'invested_amount': 1300000,
+        'idle_amount': 0,
+        'projects_amount': 6000000,
+        'remaining_amount': 4700000,
+        'open_projects': 1,
+    }, (
+        'Сводка фонда должна учитывать созданные пожертвования, '
+        'распределение средств и закрытые проекты.'
+    )
+    actual = asyncio.run(scan())
+    stats = response.json()
+    assert {field: stats[field] for field in actual} == actual, (
+        'Инкрементальная сводка должна совпадать с полным пересчетом.'
+    )
+
+
+async def parallel_first_reads():
+    async def read():
+        async with TestingSessionLocal() as session:
+            return (await fund_summary_crud.get(session)).projects_amount
+
+    return await asyncio.gather(*(read() for _ in range(10)))
+
+
+def test_summary_created_once(charity_project):
+    assert asyncio.run(parallel_first_reads()) == [
+        charity_project.full_amount
+    ] * 10, (
+        'Одновременное первое чтение сводки не должно приводить '
+        'к конфликту при создании строки.'
+    )
+
+
+def test_apply_without_summary_row(user_client, charity_project):
+    user_client.post(DONATIONS_URL, json={'full_amount': 100})
+    response = user_client.get(STATS_URL)
+    assert response.json()['invested_amount'] == 100, (
+        'Если строки сводки еще нет, сводка строится пересчетом '
+        'и учитывает все изменения.'
+    )
@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from conftest import (TestingSessionLocal, app, get_async_session,
+                      override_db)
+from fastapi.testclient import TestClient
+from fastapi_users import exceptions
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
+
+from app.core.user import CachedJWTStrategy, UserManager
+from app.crud.cache import LocalCache
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate
+
+
+class FakeUserManager:
+    def __init__(self, user):
+        self.user = user
+        self.gets = 0
+
+    def parse_id(self, value):
+        return int(value)
+
+    async def get(self, user_id):
+        self.gets += 1
+        if user_id != self.user.id:
+            raise exceptions.UserNotExists()
+        return self.user
+
+
+@pytest.fixture
+def strategy():
+    return CachedJWTStrategy(
+        secret='test', lifetime_seconds=60, cache=LocalCache(100, 60)
+    )
+
+
+def make_user(**kwargs):
+    data = dict(
+        id=7, email='dead@pool.com', hashed_password='hash',
+        is_active=True, is_superuser=False, is_verified=True,
+    )
+    data.update(kwargs)
+    return User(**data)
+
+
+def read(strategy, token, manager):
+    return asyncio.run(strategy.read_token(token, manager))
+
+
+def test_verified_token_is_cached(strategy):
+    manager = FakeUserManager(make_user())
+    token = asyncio.run(strategy.write_token(manager.user))
+    first = read(strategy, token, manager)
+    second = read(strategy, token, manager)
+    assert manager.gets == 1, (
+        'Повторная проверка того же токена не должна загружать '
+        'пользователя из БД.'
+    )
+    assert second.id == first.id == 7 and second.is_active
+    assert second.hashed_password is None, (
+        'В кэше токенов не должен храниться хеш пароля.'
+    )
+
+
+def test_user_update_invalidates_cache(strategy):
+    manager = FakeUserManager(make_user())
+    token = asyncio.run(strategy.write_token(manager.user))
+    read(strategy, token, manager)
+    manager.user = make_user(is_active=False)
+    strategy.invalidate_user(7)
+    user = read(strategy, token, manager)
+    assert manager.gets == 2 and not user.is_active, (
+        'После изменения пользователя токен должен проверяться по БД.'
+    )
+
+
+def test_revoked_token_rejected_in_other_process(strategy):
+    manager = FakeUserManager(make_user())
+    token = asyncio.run(strategy.write_token(manager.user))
+    assert read(strategy, token, manager).id == 7
+    # Другой процесс изменил пользователя: его кэш токенов пуст,
+    # а invalidate_user в этом процессе не вызывался.
+    manager.user = make_user(
+        is_superuser=True, token_valid_after=datetime.utcnow()
+    )
+    other = CachedJWTStrategy(
+        secret='test', lifetime_seconds=60, cache=LocalCache(100, 60)
+    )
+    assert read(other, token, manager) is None, (
+        'Токен, выпущенный раньше token_valid_after, должен '
+        'отклоняться при проверке по БД.'
+    )
+    new_token = asyncio.run(other.write_token(manager.user))
+    assert read(other, new_token, manager).is_superuser, (
+        'Признаки пользователя берутся из БД, а не из токена.'
+    )
+
+
+def test_update_revokes_tokens():
+    async def deactivate():
+        async with TestingSessionLocal() as session:
+            user_db = SQLAlchemyUserDatabase(session, User)
+            manager = UserManager(user_db)
+            user = await manager.create(UserCreate(
+                email='dead@pool.com', password='chimichangas4life'
+            ))
+            token = await strategy.write_token(user)
+            await manager.update(UserUpdate(is_active=False), user)
+            return await strategy.read_token(token, manager)
+
+    strategy = CachedJWTStrategy(secret='test', lifetime_seconds=60)
+    assert asyncio.run(deactivate()) is None, (
+        'После деактивации пользователя выпущенные ему токены '
+        'должны отзываться.'
+    )
+
+
+def test_invalid_token(strategy):
+    manager = FakeUserManager(make_user())
+    assert read(strategy, 'not-a-token', manager) is None
+    assert read(strategy, None, manager) is None
+
+
+def test_login_and_cached_requests():
+    app.dependency_overrides = {get_async_session: override_db}
+    with TestClient(app) as client:
+        client.post('/auth/register', json={
+            'email': 'dead@pool.com', 'password': 'chimichangas4life',
+        })
+        token = client.post('/auth/jwt/login', data={
+            'username': 'dead@pool.com', 'password': 'chimichangas4life',
+        }).json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        for _ in range(2):
+            response = client.get('/donation/my', headers=headers)
+            assert response.status_code == 200, (
+                'Запрос с действующим токеном должен выполняться '
+                'успешно, в том числе из кэша токенов.'
+            )
+        response = client.post(
+            '/charity_project/', headers=headers,
+            json={'name': 'x', 'description': 'x', 'full_amount': 1},
+        )
+        assert response.status_code == 403, (
+            'Обычному пользователю создание проекта недоступно.'
+        )
+    app.dependency_overrides = {}